@@ -1,35 +1,118 @@
 from PIL import Image
+import argparse
+import io
 import os
+import struct
+import sys
+from pathlib import Path
 
-try:
-    # Obtener la ruta del directorio actual
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    webp_path = os.path.join(current_dir, 'scraper.ico.webp')
-    ico_path = os.path.join(current_dir, 'scraper.ico')
 
+def encode_dib(frame):
+    """Codifica un frame RGBA como DIB de 32 bits sin comprimir (formato BMP del ICO)."""
+    width, height = frame.size
+    # BITMAPINFOHEADER: la altura se duplica para incluir la máscara AND
+    header = struct.pack('<IiiHHIIiiII', 40, width, height * 2, 1, 32, 0, 0, 0, 0, 0, 0)
+    # Mapa XOR: filas de abajo hacia arriba en orden BGRA
+    xor = frame.transpose(Image.Transpose.FLIP_TOP_BOTTOM).tobytes('raw', 'BGRA')
+    # Máscara AND vacía (la transparencia la aporta el canal alfa), filas alineadas a 32 bits
+    and_mask = bytes(((width + 31) // 32) * 4 * height)
+    return header + xor + and_mask
+
+
+def write_ico(ico_path, frames):
+    """Escribe un archivo ICO codificando cada frame una sola vez.
+
+    Los tamaños de hasta 48px se guardan como DIB sin comprimir; los mayores como PNG.
+    """
+    payloads = []
+    for frame in frames:
+        if frame.size[0] <= 48:
+            payloads.append(encode_dib(frame))
+            continue
+        buf = io.BytesIO()
+        frame.save(buf, 'PNG', optimize=False, compress_level=6)
+        payloads.append(buf.getvalue())
+
+    # ICONDIR (6 bytes) + un ICONDIRENTRY (16 bytes) por imagen
+    header = struct.pack('<HHH', 0, 1, len(frames))
+    entries = []
+    offset = 6 + 16 * len(frames)
+    for frame, data in zip(frames, payloads):
+        width, height = frame.size
+        # En el formato ICO, 0 significa 256 píxeles
+        entries.append(struct.pack('<BBBBHHII', width % 256, height % 256, 0, 0,
+                                   1, 32, len(data), offset))
+        offset += len(data)
+
+    # Armar el archivo completo en un único buffer y escribirlo de una vez
+    data = b''.join([header, *entries, *payloads])
+    with open(ico_path, 'wb') as f:
+        f.write(data)
+
+
+def build_ico(webp_path, ico_path):
+    """Convierte una imagen (normalmente WebP) en un .ico con los tamaños estándar."""
     # Abrir la imagen webp
     print(f"Abriendo imagen desde: {webp_path}")
     img = Image.open(webp_path)
+    # Decodificar la imagen una sola vez; los pasos siguientes trabajan sobre
+    # el buffer ya materializado en memoria
+    img.load()
     
-    # Convertir a RGB si es necesario
-    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+    # Trabajar siempre en RGBA (4 bytes por píxel) para que todos los
+    # redimensionados usen el mismo camino; convertir solo si hace falta
+    if img.mode != 'RGBA':
         img = img.convert('RGBA')
-    else:
-        img = img.convert('RGB')
 
-    # Redimensionar a tamaños comunes de iconos
-    icon_sizes = [(16,16), (32,32), (48,48), (64,64), (128,128), (256,256)]
-    
-    # Crear versiones del icono en diferentes tamaños
-    img_list = []
-    for size in icon_sizes:
-        resized_img = img.resize(size, Image.Resampling.LANCZOS)
-        img_list.append(resized_img)
+    # Crear versiones del icono en cascada, de mayor a menor: cada tamaño se
+    # obtiene del anterior en lugar de remuestrear siempre la imagen original
+    # reducing_gap reduce primero por un factor entero (promedio de bloques)
+    # y aplica LANCZOS solo sobre el resultado, evitando barrer toda la
+    # resolución original con el filtro completo
+    prev = img.resize((256,256), Image.Resampling.LANCZOS, reducing_gap=3.0)
+    # A partir de aquí solo se usa la versión de 256x256: liberar el original
+    img.close()
+    img_list = [prev]
+    for size in [(128,128), (64,64), (48,48), (32,32), (16,16)]:
+        # En tamaños pequeños LANCZOS no aporta calidad visible; BOX promedia
+        # el área y es bastante más barato
+        filt = Image.Resampling.LANCZOS if size[0] >= 128 else Image.Resampling.BOX
+        prev = prev.resize(size, filt)
+        img_list.append(prev)
+    # Volver a orden ascendente (16 -> 256)
+    img_list.reverse()
 
     # Guardar como ICO con múltiples tamaños
     print(f"Guardando icono en: {ico_path}")
-    img_list[0].save(ico_path, format='ICO', sizes=icon_sizes, append_images=img_list[1:])
-    print("✅ Conversión completada exitosamente")
+    write_ico(ico_path, img_list)
+
+
+def _ico_path_for(webp_path):
+    """Ruta .ico de salida para un archivo de entrada ('x.ico.webp' -> 'x.ico')."""
+    if webp_path.stem.endswith('.ico'):
+        return webp_path.with_suffix('')
+    return webp_path.with_suffix('.ico')
 
-except Exception as e:
-    print(f"❌ Error durante la conversión: {str(e)}")
\ No newline at end of file
+
+if __name__ == '__main__':
+    # Obtener la ruta del directorio actual
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser(description='Convert a WebP image into a multi-size .ico file')
+    parser.add_argument('src', nargs='?', default=os.path.join(current_dir, 'scraper.ico.webp'), help='Source image')
+    parser.add_argument('dst', nargs='?', default=os.path.join(current_dir, 'scraper.ico'), help='Output .ico path')
+    parser.add_argument('--dir', help='Convert every .webp file in this folder within a single process')
+    args = parser.parse_args()
+
+    # Solo se capturan errores de lectura/escritura de archivos; cualquier otro
+    # error (y los avisos de Pillow) se propaga con su traceback completo
+    try:
+        if args.dir:
+            for webp_path in sorted(Path(args.dir).glob('*.webp')):
+                build_ico(webp_path, _ico_path_for(webp_path))
+        else:
+            build_ico(args.src, args.dst)
+    except OSError as e:
+        print(f"❌ Error durante la conversión: {str(e)}")
+        sys.exit(1)
+    print("✅ Conversión completada exitosamente")
@@ -3,14 +3,44 @@ Módulo de interfaz gráfica para el SEO Spider.
 """
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+from collections import namedtuple
+from contextlib import contextmanager
 from datetime import datetime
 import os
+import queue
+import concurrent.futures
+import re
+import subprocess
+import sys
 import threading
 import time
-from ..core.seo_analyzer import SEOAnalyzer
+from urllib.parse import urlparse
+from ..core.seo_analyzer import SEOAnalyzer, LINK_COLUMNS
+from ..core.playwright_handler import shutdown_playwright
 from .styles import ThemeColors, StyleConfig
 
+# Estadísticas del analyzer leídas una sola vez para los mensajes de estado
+_AnalysisStats = namedtuple('_AnalysisStats', 'total_pages urls_pending elapsed_str')
+
 class SEOSpiderGUI:
+    # Máximo de líneas que conserva el log (se descartan las más antiguas)
+    LOG_MAX_LINES = 2000
+    # Máximo de mensajes insertados por volcado del log
+    LOG_BATCH_MAX = 500
+
+    # Títulos de las pestañas, en el orden en que se añaden al notebook
+    TAB_NAMES = ('Análisis Completo', 'URLs Específicas')
+
+    # Términos técnicos cuyos mensajes no se muestran en el log, compilados
+    # en una sola expresión para revisar cada mensaje en una única pasada
+    _TECH_RE = re.compile('|'.join(map(re.escape, [
+        "Status Code:", "Headers:", "Content preview:",
+        "Contenido dinámico", "playwright.",
+        "Renderizado con Playwright",
+        "Data from this session",
+        "Cannot read properties"
+    ])))
+
     def __init__(self, root):
         self.root = root
         self.root.title("Herramienta SEO Spider - Analizador de Sitios Web BTS")
@@ -32,6 +62,30 @@ class SEOSpiderGUI:
         
         self.analyzer = None
         self.is_analyzing = False
+        # Tarea programada de la animación de la barra (None si está detenida)
+        self._anim_job = None
+        # Cola de líneas de log pendientes; se vuelcan en bloque desde el hilo de Tk
+        self._log_queue = queue.Queue()
+        # Último porcentaje mostrado en la barra (para no redibujarla sin cambios)
+        self._last_pct = -1
+        # Temas ttk ya creados y configurados ('seo_light' / 'seo_dark')
+        self._themes_applied = set()
+        # Estado del analyzer cacheado para el callback de progreso
+        self._is_unbounded = False
+        self._to_visit = None
+        # Pestaña activa, actualizada desde on_tab_changed
+        self._active_tab = self.TAB_NAMES[0]
+        # Hilo de trabajo persistente: los análisis se encolan como tareas
+        # en lugar de crear un hilo nuevo por cada ejecución
+        self._jobs = queue.Queue()
+        self._worker_thread = threading.Thread(target=self._worker, daemon=True)
+        self._worker_thread.start()
+        # Al cerrar la ventana se detiene el hilo de trabajo para que libere Playwright
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        # Única instancia de ttk.Style para toda la aplicación
+        self.style = ttk.Style(self.root)
+        self._configure_styles()
         
         self.setup_ui()
     
@@ -60,8 +114,6 @@ class SEOSpiderGUI:
         title_label.grid(row=0, column=1, sticky="w")
 
         # Botón para cambiar tema con estilo mejorado
-        style = ttk.Style()
-        style.configure('Theme.TButton', padding=5)
         self.theme_button = ttk.Button(header_frame, 
                                      text="🌙", 
                                      command=self.toggle_theme, 
@@ -78,18 +130,20 @@ class SEOSpiderGUI:
         top_container.columnconfigure(0, weight=1)
         top_container.rowconfigure(0, weight=1)
         
-        # Configurar estilos para ttk
-        self.style = ttk.Style(self.root)
-        self.style.theme_use('clam')  # Usar un tema que permita configurar colores
-        
         # Guardar widgets que necesitan cambio de color manual
         self.widgets_to_style = {
             'text': [],
-            'paned': [paned]
+            'paned': [paned],
+            # Widgets ttk de la cabecera: se refrescan explícitamente al cambiar de tema
+            'generic': [header_frame, title_label, logo_label, self.theme_button]
         }
 
         # Bottom container (progreso, botones, log)
         bottom_container = ttk.Frame(paned)
+        # Tamaño fijo: los cambios en el log o el progreso no propagan un
+        # recálculo de geometría hacia el PanedWindow
+        bottom_container.grid_propagate(False)
+        bottom_container.configure(height=200, width=1)
         # Configurar el contenedor inferior para manejar correctamente el espacio
         bottom_container.columnconfigure(0, weight=1)
         bottom_container.rowconfigure(0, weight=0)  # Progress area
@@ -98,10 +152,6 @@ class SEOSpiderGUI:
         paned.add(top_container, height=600)  # Dar más altura inicial al contenedor superior
         paned.add(bottom_container, height=200)  # Altura fija para el contenedor inferior
         
-        # Inicialmente configurar el paned window para dar más espacio a la parte superior
-        self.root.update_idletasks()
-        paned.sash_place(0, 0, int(self.initial_height * 0.6))  # Aumentado a 80% para la parte superior
-        
         # Crear notebook dentro del top_container
         self.notebook = ttk.Notebook(top_container)
         self.notebook.grid(row=0, column=0, sticky="nsew", pady=(0, 10))
@@ -110,8 +160,8 @@ class SEOSpiderGUI:
         self.full_analysis_frame = ttk.Frame(self.notebook)
         self.specific_urls_frame = ttk.Frame(self.notebook)
         
-        self.notebook.add(self.full_analysis_frame, text='Análisis Completo')
-        self.notebook.add(self.specific_urls_frame, text='URLs Específicas')
+        self.notebook.add(self.full_analysis_frame, text=self.TAB_NAMES[0])
+        self.notebook.add(self.specific_urls_frame, text=self.TAB_NAMES[1])
         
         # Configurar las pestañas
         self.setup_full_analysis_tab()
@@ -126,19 +176,12 @@ class SEOSpiderGUI:
         # Vincular cambio de pestaña para mostrar/ocultar controles de progreso
         self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
         # Inicializar visibilidad según la pestaña activa
-        try:
-            self.on_tab_changed(None)
-        except Exception:
-            pass
+        self.on_tab_changed(None)
         
-        # Intentar posicionar la división
-        try:
-            self.root.update_idletasks()
-            # Reducir el espacio superior para compactar la interfaz
-            desired_y = int(self.initial_height * 0.6)  # Aumentar el espacio superior
-            paned.sash_place(0, 0, desired_y)
-        except Exception:
-            pass
+        # Posicionar la división en el primer momento ocioso de Tk (antes del
+        # primer pintado), sin forzar un recálculo síncrono de la geometría
+        desired_y = int(self.initial_height * 0.6)
+        self.root.after_idle(lambda: paned.sash_place(0, 0, desired_y))
 
         # Aplicar tema inicial
         self.apply_theme()
@@ -153,8 +196,17 @@ class SEOSpiderGUI:
         colors = ThemeColors.Dark if self.is_dark_mode else ThemeColors.Light
         self.theme_button.config(text="☀️" if self.is_dark_mode else "🌙")
         
-        # Aplicar estilos a través de StyleConfig
-        StyleConfig.configure_styles(self.style, colors)
+        # Cada modo es un tema ttk propio (derivado de 'clam') que se configura
+        # una única vez; los cambios posteriores solo activan el tema ya creado
+        theme_name = 'seo_dark' if self.is_dark_mode else 'seo_light'
+        if theme_name not in self._themes_applied:
+            self.style.theme_create(theme_name, parent='clam')
+            self.style.theme_use(theme_name)
+            StyleConfig.configure_styles(self.style, colors)
+            self._configure_progress_style()
+            self._themes_applied.add(theme_name)
+        else:
+            self.style.theme_use(theme_name)
         
         # Aplicar a widgets text
         for widget in self.widgets_to_style['text']:
@@ -164,6 +216,16 @@ class SEOSpiderGUI:
         for widget in self.widgets_to_style['paned']:
             StyleConfig.configure_paned_widget(widget, colors)
 
+        # Reasignar su propio estilo a los widgets registrados para que tomen
+        # el tema activo sin recorrer el resto del árbol
+        for widget in self.widgets_to_style['generic']:
+            widget.configure(style=widget.cget('style') or widget.winfo_class())
+
+    def set_analyze_buttons_state(self, state):
+        """Habilita o deshabilita los botones de análisis de ambas pestañas"""
+        self.analyze_full_button.config(state=state)
+        self.analyze_specific_button.config(state=state)
+
     def on_tab_changed(self, event):
         """Mostrar u ocultar elementos según la pestaña activa.
         
@@ -171,27 +233,26 @@ class SEOSpiderGUI:
         solo en su pestaña correspondiente.
         """
         try:
-            current_text = self.notebook.tab(self.notebook.select(), 'text')
-        except Exception:
+            # Una sola consulta a Tcl: índice de la pestaña activa
+            current_index = self.notebook.index('current')
+        except tk.TclError:
             return
+        self._active_tab = self.TAB_NAMES[current_index]
+
+        # Cada pestaña tiene su propio botón de análisis: solo se alterna
+        # cuál de los dos está visible
+        if current_index == 0:
+            if hasattr(self, 'analyze_full_button'):
+                self.analyze_full_button.grid()
+                self.analyze_specific_button.grid_remove()
+        else:
+            if hasattr(self, 'analyze_full_button'):
+                self.analyze_specific_button.grid()
+                self.analyze_full_button.grid_remove()
 
-        try:
-            # Usar el mismo botón principal para ambos modos, cambiando label y comando
-            if current_text == 'Análisis Completo':
-                if hasattr(self, 'analyze_button'):
-                    self.analyze_button.config(text='Iniciar Análisis Completo', command=self.start_full_analysis)
-                    self.analyze_button.grid()
-            else:
-                # En la pestaña de URLs específicas reutilizamos el mismo botón
-                if hasattr(self, 'analyze_button'):
-                    self.analyze_button.config(text='Analizar URLs Específicas', command=self.start_specific_analysis)
-                    self.analyze_button.grid()
-
-            # El log siempre visible abajo
-            if hasattr(self, 'log_frame'):
-                self.log_frame.grid_configure(row=1)
-        except Exception:
-            pass
+        # El log siempre visible abajo
+        if hasattr(self, 'log_frame'):
+            self.log_frame.grid_configure(row=1)
 
     def setup_full_analysis_tab(self):
         """Configurar pestaña de análisis completo"""
@@ -221,6 +282,9 @@ class SEOSpiderGUI:
 
         ttk.Label(config_frame, text="Delay entre peticiones (seg):").grid(row=0, column=0, sticky="w", padx=(0, 5))
         self.delay_var = tk.StringVar(value="1")
+        # Valor numérico del delay, actualizado en cada cambio del spinbox
+        self._delay = 1.0
+        self.delay_var.trace_add('write', lambda *_: self._cache_delay(self.delay_var, '_delay'))
         delay_spin = ttk.Spinbox(config_frame, from_=0.1, to=10, increment=0.1,
                                 textvariable=self.delay_var, width=8)
         delay_spin.grid(row=0, column=1, sticky="w")
@@ -293,6 +357,8 @@ class SEOSpiderGUI:
         # Delay
         ttk.Label(config_frame, text="Delay entre peticiones (seg):").grid(row=0, column=0, sticky="w", padx=(0, 5))
         self.specific_delay_var = tk.StringVar(value="1")
+        self._specific_delay = 1.0
+        self.specific_delay_var.trace_add('write', lambda *_: self._cache_delay(self.specific_delay_var, '_specific_delay'))
         specific_delay_spin = ttk.Spinbox(config_frame, from_=0.1, to=10, increment=0.1,
                                          textvariable=self.specific_delay_var, width=8)
         specific_delay_spin.grid(row=0, column=1, sticky="w")
@@ -325,13 +391,20 @@ class SEOSpiderGUI:
         button_container = ttk.Frame(action_frame)
         button_container.pack()
 
-        # Solo botón de Limpiar URLs (el botón de análisis se maneja desde analyze_button principal)
+        # Solo botón de Limpiar URLs (el botón de análisis está en el área de progreso)
         self.clear_urls_button = ttk.Button(button_container,
                                           text="Limpiar URLs",
                                           command=self.clear_specific_urls,
                                           width=15)
         self.clear_urls_button.pack(side=tk.LEFT, padx=5)
     
+    def _cache_delay(self, var, attr):
+        """Guarda en attr el valor de var como float (None si no es válido)"""
+        try:
+            setattr(self, attr, float(var.get() or 1))
+        except ValueError:
+            setattr(self, attr, None)
+
     def clear_specific_urls(self):
         """Limpia el área de texto de URLs específicas"""
         self.urls_text.delete(1.0, tk.END)
@@ -347,20 +420,34 @@ class SEOSpiderGUI:
         btn_frame = ttk.Frame(self.progress_container)
         btn_frame.grid(row=0, column=0, sticky='ew', pady=(0, 4))
         btn_frame.columnconfigure(0, weight=1)
-
-        # Botón iniciar análisis
-        self.analyze_button = ttk.Button(btn_frame,
-                                       text="Iniciar Análisis Completo",
-                                          command=self.start_full_analysis,
-                                          width=30)  # Aumentado más el ancho para mostrar todo el texto
-        self.analyze_button.grid(row=0, column=0)
+        btn_frame.grid_propagate(False)
+        btn_frame.configure(height=40)
+
+        # Botones iniciar análisis (uno por pestaña; on_tab_changed muestra el que corresponda)
+        self.analyze_full_button = ttk.Button(btn_frame,
+                                              text="Iniciar Análisis Completo",
+                                              command=self.start_full_analysis,
+                                              width=30)  # Aumentado más el ancho para mostrar todo el texto
+        self.analyze_full_button.grid(row=0, column=0)
+        self.analyze_full_button.grid_remove()
+        self.analyze_specific_button = ttk.Button(btn_frame,
+                                                  text="Analizar URLs Específicas",
+                                                  command=self.start_specific_analysis,
+                                                  width=30)
+        self.analyze_specific_button.grid(row=0, column=0)
+        self.analyze_specific_button.grid_remove()
 
         # Frame para estado y barra de progreso
         progress_frame = ttk.LabelFrame(self.progress_container, text="Estado del Análisis", style="Options.TLabelframe")
         progress_frame.grid(row=1, column=0, sticky="ew", padx=10)
         progress_frame.columnconfigure(0, weight=1)
 
-        self.progress_label = ttk.Label(progress_frame, text="🟢 Listo para analizar", padding=(5,5))
+        # Texto y valor de la barra ligados a variables de Tk: actualizarlas no
+        # requiere reconfigurar los widgets
+        self._progress_text = tk.StringVar(value="🟢 Listo para analizar")
+        self._progress_value = tk.IntVar(value=0)
+        self._progress_max = 100
+        self.progress_label = ttk.Label(progress_frame, textvariable=self._progress_text, padding=(5,5))
         self.progress_label.grid(row=0, column=0, sticky="w")
 
         # Frame para la barra de progreso animada
@@ -369,16 +456,10 @@ class SEOSpiderGUI:
         progress_bar_frame.columnconfigure(0, weight=1)
 
         # Barra de progreso principal
-        self.progress = ttk.Progressbar(progress_bar_frame, mode='determinate', style='Animated.Horizontal.TProgressbar')
+        self.progress = ttk.Progressbar(progress_bar_frame, mode='determinate', style='Animated.Horizontal.TProgressbar',
+                                        variable=self._progress_value, maximum=self._progress_max)
         self.progress.grid(row=0, column=0, sticky="ew")
 
-        # Configurar estilo animado para la barra de progreso
-        style = ttk.Style()
-        style.configure('Animated.Horizontal.TProgressbar', 
-                        background='#2196f3',  # Azul material design
-                        troughcolor='#e0e0e0',  # Gris claro
-                        thickness=15)  # Hacer la barra más gruesa
-
         # Iniciar la animación de la barra
         self.progress_animation_frame = 0
         # Mezcla suave de azules a rojos y viceversa
@@ -396,12 +477,14 @@ class SEOSpiderGUI:
             '#1e88e5',  # Azul oscuro
             '#2196f3',  # Azul material
         ]
-        self.update_progress_animation()
+        # La animación se inicia solo al comenzar un análisis (ver start_analysis)
         
         # Frame para los botones de control (Detener y Exportar)
         control_buttons_frame = ttk.Frame(self.progress_container)
         control_buttons_frame.grid(row=2, column=0, sticky="ew", pady=(5,0))
         control_buttons_frame.columnconfigure(0, weight=1)
+        control_buttons_frame.grid_propagate(False)
+        control_buttons_frame.configure(height=40)
 
         # Frame interno para centrar los botones
         buttons_inner_frame = ttk.Frame(control_buttons_frame)
@@ -422,10 +505,23 @@ class SEOSpiderGUI:
                                       width=15)
         self.export_button.pack(side=tk.LEFT, padx=5)
     
-    def setup_buttons_area(self, parent):
-        """Configurar área de botones"""
-        # Esta función ya no se usa, los botones se movieron al área de progreso
-        pass
+    def _set_progress_max(self, maximum):
+        """Fija el máximo de la barra y lo guarda para leerlo sin consultar a Tk"""
+        self._progress_max = maximum
+        self.progress.config(maximum=maximum)
+
+    def _configure_styles(self):
+        """Configuración inicial de estilos ttk (se ejecuta una sola vez)"""
+        self.style.theme_use('clam')  # Usar un tema que permita configurar colores
+        self.style.configure('Theme.TButton', padding=5)
+        self._configure_progress_style()
+
+    def _configure_progress_style(self):
+        """Configura el estilo animado de la barra de progreso en el tema activo"""
+        self.style.configure('Animated.Horizontal.TProgressbar', 
+                             background='#2196f3',  # Azul material design
+                             troughcolor='#e0e0e0',  # Gris claro
+                             thickness=15)  # Hacer la barra más gruesa
     
     def setup_log_area(self, parent):
         """Configurar área de log"""
@@ -451,13 +547,47 @@ class SEOSpiderGUI:
         log_text_frame.rowconfigure(0, weight=1)
 
         # Configurar el área de texto con altura más pequeña
-        self.log_text = tk.Text(log_text_frame, wrap=tk.WORD, height=4)  # Reducida a 4 líneas
+        self.log_text = tk.Text(log_text_frame, wrap=tk.WORD, height=4, state=tk.DISABLED)  # Reducida a 4 líneas
         self.widgets_to_style['text'].append(self.log_text)
         log_scrollbar = ttk.Scrollbar(log_text_frame, orient=tk.VERTICAL, command=self.log_text.yview)
         self.log_text.configure(yscrollcommand=log_scrollbar.set)
 
         self.log_text.grid(row=0, column=0, sticky="nsew")
         log_scrollbar.grid(row=0, column=1, sticky="ns")
+
+        # Volcar periódicamente las líneas encoladas por update_progress
+        self.root.after(100, self._drain_log)
+
+    def _drain_log(self):
+        """Inserta en el log, con una sola operación, las líneas encoladas"""
+        lines = []
+        try:
+            while len(lines) < self.LOG_BATCH_MAX:
+                lines.append(self._log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if lines:
+            self._append_log("".join(f"{line}\n" for line in lines))
+        self.root.after(100, self._drain_log)
+
+    def _append_log(self, text):
+        """Añade texto al log conservando solo las últimas LOG_MAX_LINES líneas.
+
+        El widget se mantiene deshabilitado salvo durante la escritura.
+        """
+        self.log_text.config(state=tk.NORMAL)
+        self.log_text.insert(tk.END, text)
+        n = int(self.log_text.index('end-1c').split('.')[0])
+        if n > self.LOG_MAX_LINES:
+            self.log_text.delete('1.0', f'{n - self.LOG_MAX_LINES}.0')
+        self.log_text.config(state=tk.DISABLED)
+        self.log_text.see(tk.END)
+
+    def clear_log(self):
+        """Vacía el área de log"""
+        self.log_text.config(state=tk.NORMAL)
+        self.log_text.delete(1.0, tk.END)
+        self.log_text.config(state=tk.DISABLED)
     
     def start_full_analysis(self):
         """Iniciar el análisis completo"""
@@ -473,9 +603,8 @@ class SEOSpiderGUI:
             self.url_entry.delete(0, tk.END)
             self.url_entry.insert(0, url)
         
-        try:
-            delay = float(self.delay_var.get())
-        except ValueError:
+        delay = self._delay
+        if delay is None:
             messagebox.showerror("Error", "Por favor, ingresa un valor válido para delay")
             return
         
@@ -485,21 +614,26 @@ class SEOSpiderGUI:
     
     def start_specific_analysis(self):
         """Iniciar el análisis de URLs específicas"""
-        urls_text = self.urls_text.get(1.0, tk.END).strip()
-        if not urls_text:
+        # Leer el Text línea a línea en lugar de copiar todo el buffer de una
+        # vez; en la misma pasada se añade el esquema si falta y se descartan
+        # duplicados conservando el orden de entrada
+        last = int(self.urls_text.index('end-1c').split('.')[0])
+        urls = {}
+        for i in range(1, last + 1):
+            line = self.urls_text.get(f'{i}.0', f'{i}.end').strip()
+            if line:
+                urls[line if line.startswith(('http://', 'https://')) else 'https://' + line] = None
+        if not urls:
             messagebox.showerror("Error", "Por favor, ingresa al menos una URL")
             return
-
-        urls = [u.strip() for u in urls_text.split('\n') if u.strip()]
-        valid_urls = []
-        for u in urls:
-            if not u.startswith(('http://', 'https://')):
-                u = 'https://' + u
-            valid_urls.append(u)
+        valid_urls = list(urls)
 
         base_url = valid_urls[0]
         max_pages = len(valid_urls)
-        delay = float(self.specific_delay_var.get())
+        delay = self._specific_delay
+        if delay is None:
+            messagebox.showerror("Error", "Por favor, ingresa un valor válido para delay")
+            return
 
         # Llamar a start_analysis pasando los flags de esta pestaña sin
         # sobreescribir las variables globales de la pestaña de análisis completo.
@@ -514,10 +648,10 @@ class SEOSpiderGUI:
     
     def start_analysis(self, base_url, max_pages, delay, specific_urls=None, analyze_images=None, analyze_links=None):
         """Iniciar el análisis (común para ambos modos)"""
-        self.log_text.delete(1.0, tk.END)
+        self.clear_log()
         
         self.is_analyzing = True
-        self.analyze_button.config(state=tk.DISABLED)
+        self.set_analyze_buttons_state(tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
         self.export_button.config(state=tk.DISABLED)
         
@@ -527,17 +661,19 @@ class SEOSpiderGUI:
             pass
         
         # Configurar la barra de progreso
-        self.progress['value'] = 0
+        self._progress_value.set(0)
+        self._last_pct = -1
+        self.start_progress_animation()
         
         # Ajustes según el modo (con o sin límite)
         if max_pages == 1:
             # Modo sin límite: iniciar con un valor base razonable
-            self.progress['maximum'] = 100  # Valor inicial que se ajustará dinámicamente
-            self.progress_label.config(text="🔄 Preparando búsqueda completa del dominio (sin límite)...")
+            self._set_progress_max(100)  # Valor inicial que se ajustará dinámicamente
+            self._progress_text.set("🔄 Preparando búsqueda completa del dominio (sin límite)...")
         else:
             # Modo con límite: usar el número máximo de páginas
-            self.progress['maximum'] = max_pages
-            self.progress_label.config(text=f"🔄 Preparando análisis ({max_pages} páginas máximo)")
+            self._set_progress_max(max_pages)
+            self._progress_text.set(f"🔄 Preparando análisis ({max_pages} páginas máximo)")
 
         # Obtener estados de los checkboxes (permitir overrides desde caller)
         if analyze_images is None:
@@ -570,11 +706,56 @@ class SEOSpiderGUI:
             analyze_images=analyze_images_val,
             analyze_links=analyze_links_val
         )
+        self._bind_analyzer_state()
         
-        thread = threading.Thread(target=self.run_analysis)
-        thread.daemon = True
-        thread.start()
+        self._jobs.put(self.run_analysis)
     
+    def _bind_analyzer_state(self):
+        """Cachea el modo y la cola del analyzer para no consultarlos en cada progreso.
+
+        Debe llamarse de nuevo al reanudar, porque resume_crawling reemplaza to_visit.
+        """
+        self._is_unbounded = self.analyzer.max_pages == 1
+        self._to_visit = getattr(self.analyzer, 'to_visit', None)
+
+    def _worker(self):
+        """Ejecuta, una a una, las tareas encoladas en self._jobs (None termina el bucle)"""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            try:
+                job()
+            except Exception as e:
+                print(f"❌ Error en el hilo de análisis: {e}")
+
+        # Playwright se lanzó en este hilo, así que se cierra aquí
+        try:
+            handler = getattr(self.analyzer, 'playwright_handler', None)
+            if handler:
+                handler.close()
+            shutdown_playwright()
+        except Exception as e:
+            print(f"❌ Error cerrando Playwright: {e}")
+
+    def _on_close(self):
+        """Detener el análisis y el hilo de trabajo antes de destruir la ventana."""
+        if self.analyzer:
+            self.analyzer.is_running = False
+        self._jobs.put(None)
+        self.root.withdraw()
+        # Sin join en el hilo de Tk: el worker aún puede encolar callbacks con
+        # after_idle mientras termina la página actual
+        self._close_deadline = time.monotonic() + 10
+        self._finish_close()
+
+    def _finish_close(self):
+        """Destruir la ventana cuando el hilo de trabajo haya terminado (máximo 10 s)."""
+        if self._worker_thread.is_alive() and time.monotonic() < self._close_deadline:
+            self.root.after(100, self._finish_close)
+            return
+        self.root.destroy()
+
     def run_analysis(self):
         """Ejecutar el análisis en el hilo separado"""
         self.analyzer.crawl_site(
@@ -583,87 +764,90 @@ class SEOSpiderGUI:
         )
     
     def update_progress(self, message, progress_data=None):
+        """Callback de progreso (llamado desde el hilo del análisis).
+
+        Tk no es thread-safe: la actualización real se encola en el bucle
+        principal con after_idle.
+        """
+        self.root.after_idle(self._do_update_progress, message, progress_data)
+
+    def _do_update_progress(self, message, progress_data=None):
         """Actualizar el progreso y el log con mensajes simplificados"""
-        # Si el mensaje contiene múltiples líneas, insertarlas una por línea
-        logged_multiline = False
-        try:
-            if isinstance(message, str) and "\n" in message:
-                for line in message.splitlines():
-                    # Mantener incluso líneas vacías para separación visual
-                    try:
-                        self.log_message(line)
-                    except Exception:
-                        pass
-                logged_multiline = True
-        except Exception:
-            logged_multiline = False
+        # La ventana pudo cerrarse mientras el callback esperaba en la cola
+        if not self.root.winfo_exists():
+            return
 
         # Normalizar mensaje a texto para evitar errores si se pasa otro tipo
-        try:
-            message_text = message if isinstance(message, str) else (str(message) if message is not None else '')
-        except Exception:
-            message_text = ''
-
-        # Lista de términos técnicos para filtrar
-        technical_terms = [
-            "Status Code:", "Headers:", "Content preview:",
-            "Contenido dinámico", "playwright.",
-            "Renderizado con Playwright",
-            "Data from this session",
-            "Cannot read properties"
-        ]
-        
+        message_text = message if isinstance(message, str) else (str(message) if message is not None else '')
+
+        # Los mensajes de varias líneas se registran completos como un solo
+        # bloque (Text.insert acepta saltos de línea), sin simplificarlos
+        multiline = isinstance(message, str) and "\n" in message
+        if multiline:
+            self._log_queue.put(message.rstrip("\n"))
+
         # No mostrar mensajes que contengan términos técnicos
-        if any(term in message_text for term in technical_terms):
+        if self._TECH_RE.search(message_text):
             return
             
         # Simplificar mensajes de análisis (si no venían ya separadas en varias líneas)
-        if (not logged_multiline) and "Analizando" in message_text:
+        if (not multiline) and "Analizando" in message_text:
             url = message_text.split("Analizando")[-1].strip()
-            self.log_message(f"🔍 Analizando: {url}")
+            self._log_queue.put(f"🔍 Analizando: {url}")
             return
             
         # Para otros mensajes importantes, mostrarlos simplificados
-        if (not logged_multiline) and message_text.strip() and not message_text.startswith(("📡", "🔍", "📄", "⚙️")):
-            self.log_message(message_text)
+        if (not multiline) and message_text.strip() and not message_text.startswith(("📡", "🔍", "📄", "⚙️")):
+            self._log_queue.put(message_text)
         
         # Actualizar barra de progreso
         if progress_data and 'completed' in progress_data and 'total' in progress_data:
             completed = progress_data['completed']
             total = progress_data['total']
             
-            if (progress_data.get('total') == float('inf') or 
-                (hasattr(self.analyzer, 'max_pages') and self.analyzer.max_pages == 1)):  # Modo sin límite
+            if self._is_unbounded or total == float('inf'):  # Modo sin límite
+                # Sin total conocido no hay porcentaje: refrescar cada 5 páginas
+                if completed % 5 != 0:
+                    return
                 # En modo sin límite, ajustamos la barra de progreso dinámicamente
-                if completed >= self.progress['maximum']:
+                if completed >= self._progress_max:
                     # Si superamos el máximo, duplicamos el tamaño de la barra
-                    self.progress['maximum'] = max(1000, completed * 2)
+                    self._set_progress_max(max(1000, completed * 2))
                 
-                self.progress['value'] = completed
-                pending = len(self.analyzer.to_visit) if hasattr(self.analyzer, 'to_visit') else 0
-                self.progress_label.config(text=f"⏳ URLs analizadas: {completed} | Pendientes: {pending}")
+                self._progress_value.set(completed)
+                pending = len(self._to_visit) if self._to_visit is not None else 0
+                self._progress_text.set(f"⏳ URLs analizadas: {completed} | Pendientes: {pending}")
             elif total and total > 0:
-                # Modo con límite
+                # Modo con límite: redibujar solo cuando cambia el porcentaje entero
+                pct = int(completed * 100 / max(total, 1))
+                if pct == self._last_pct:
+                    return
+                self._last_pct = pct
                 percentage = (completed / total) * 100
-                self.progress['value'] = completed
-                self.progress_label.config(text=f"⏳ Progreso: {completed}/{total} ({percentage:.1f}%)")
+                self._progress_value.set(completed)
+                self._progress_text.set(f"⏳ Progreso: {completed}/{total} ({percentage:.1f}%)")
             else:
                 # Fallback por si no hay total definido
-                self.progress_label.config(text=f"⏳ URLs analizadas: {completed}")
-                self.progress['value'] = completed
+                self._progress_text.set(f"⏳ URLs analizadas: {completed}")
+                self._progress_value.set(completed)
     
     def analysis_complete(self):
-        """Callback cuando el análisis se completa"""
+        """Callback cuando el análisis se completa (llamado desde el hilo del análisis)"""
+        self.root.after_idle(self._do_analysis_complete)
+
+    def _do_analysis_complete(self):
+        """Marcar el análisis como terminado y finalizarlo en el hilo principal"""
         self.is_analyzing = False
-        self.root.after(0, self.finish_analysis)
+        self.finish_analysis()
     
     def finish_analysis(self):
         """Finalizar el análisis en el hilo principal"""
+        self.stop_progress_animation()
         try:
-            self.progress['value'] = self.progress['maximum']
+            self._progress_value.set(self._progress_max)
         except Exception:
             pass
-        self.analyze_button.config(state=tk.NORMAL)
+        self.set_analyze_buttons_state(tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
         self.export_button.config(state=tk.NORMAL)
         try:
@@ -671,30 +855,119 @@ class SEOSpiderGUI:
         except Exception:
             pass
         
-        self.progress_label.config(text="✅ Análisis completado")
+        self._progress_text.set("✅ Análisis completado")
         
         # Calcular estadísticas finales
         if self.analyzer:
-            total_pages = len(self.analyzer.visited) if hasattr(self.analyzer, 'visited') else 0
-            elapsed_time = time.time() - self.analyzer.start_time if hasattr(self.analyzer, 'start_time') else 0
-            elapsed_str = f"{int(elapsed_time // 60)}m {int(elapsed_time % 60)}s"
+            stats = self._analysis_stats()
             
-            status = "✅ Análisis completado\n"
-            status += f"   📊 Total páginas analizadas: {total_pages}\n"
-            status += f"   ⏱️ Tiempo total: {elapsed_str}"
+            status = "\n".join([
+                "✅ Análisis completado",
+                f"   📊 Total páginas analizadas: {stats.total_pages}",
+                f"   ⏱️ Tiempo total: {stats.elapsed_str}",
+            ])
             self.log_message(status)
         else:
             self.log_message("✅ Análisis completado")
 
-    def save_snapshot(self):
+    def _analysis_stats(self):
+        """Lee una sola vez del analyzer los datos de los mensajes de estado"""
+        a = self.analyzer
+        start_time = getattr(a, 'start_time', None)
+        elapsed_time = time.time() - start_time if start_time else 0
+        return _AnalysisStats(
+            total_pages=len(getattr(a, 'visited', ())),
+            urls_pending=len(getattr(a, 'to_visit', ())),
+            elapsed_str=f"{int(elapsed_time // 60)}m {int(elapsed_time % 60)}s",
+        )
+
+    def _prepare_rows(self, df):
+        """Convierte un DataFrame en (cabecera, filas) listas para escribir.
+
+        Las columnas se preparan una sola vez (fechas ya formateadas, NaN como
+        celdas vacías) sin pasar por el formateador de pandas.
+        """
+        columns = []
+        for col in df.columns:
+            series = df[col]
+            if series.dtype.kind == 'M':
+                series = series.dt.strftime('%Y-%m-%d %H:%M:%S')
+            columns.append(series.astype(object).where(series.notna(), None).tolist())
+        return [str(c) for c in df.columns], list(zip(*columns))
+
+    def _write_sheet(self, writer, sheet_name, header, rows):
+        """Escribe una hoja fila a fila, el orden que exigen el modo
+        constant_memory de xlsxwriter y el modo write_only de openpyxl."""
+        if getattr(writer, 'engine', None) == 'xlsxwriter':
+            ws = writer.book.add_worksheet(sheet_name)
+            ws.write_row(0, 0, header)
+            for row_idx, row in enumerate(rows, start=1):
+                ws.write_row(row_idx, 0, row)
+            return
+
+        # Libro openpyxl en modo write_only: las filas solo se pueden añadir
+        ws = writer.create_sheet(sheet_name)
+        ws.append(header)
+        for row in rows:
+            ws.append(row)
+
+    @contextmanager
+    def _open_snapshot_writer(self, filename):
+        """Abre el destino del snapshot: xlsxwriter o, si falta, openpyxl write_only.
+
+        xlsxwriter escribe el XML en streaming (constant_memory vuelca cada fila
+        al disco). pandas abre openpyxl con el libro completo en memoria, así que
+        en ese caso se crea directamente un Workbook(write_only=True).
+        """
+        try:
+            import xlsxwriter  # noqa: F401
+        except ImportError:
+            import openpyxl
+            wb = openpyxl.Workbook(write_only=True)
+            yield wb
+            wb.save(filename)
+            return
+
+        import pandas as pd
+        with pd.ExcelWriter(filename, engine='xlsxwriter',
+                            engine_kwargs={'options': {'constant_memory': True}}) as writer:
+            yield writer
+
+    def _collect_snapshot_data(self):
+        """Copia superficial de las colecciones del analyzer para el snapshot.
+
+        Se toma en el hilo de Tk antes de lanzar el guardado, de modo que el
+        crawler pueda seguir modificando sus listas mientras se serializa.
+        No hace falta un lock: el crawler solo añade elementos (append) y
+        list() copia la lista en una sola operación bajo el GIL, así que la
+        copia es una foto coherente de un instante, aunque no incluya lo
+        que se añada justo después.
+        """
+        a = self.analyzer
+        results = getattr(a, 'results', None)
+        if not results:
+            return None
+
+        return {
+            'base_url': a.base_url,
+            'results': list(results),
+            'images': list(getattr(a, 'images', ())),
+            'links': list(getattr(a, 'links', ())),
+            'total_broken': len(getattr(a, 'broken_links', ())),
+            'total_redirects': len(getattr(a, 'redirected_urls', ())),
+            'partial': bool(getattr(a, 'to_visit', None)),
+        }
+
+    def save_snapshot(self, data=None):
         """Guardar snapshot parcial del análisis actual sin interacción del usuario.
 
+        Puede ejecutarse fuera del hilo de Tk: trabaja sobre la copia de
+        _collect_snapshot_data y solo encola mensajes para el log.
         Devuelve la ruta del archivo guardado o None si falla.
         """
-        if not self.analyzer:
-            return None
-            
-        if not hasattr(self.analyzer, 'results') or not self.analyzer.results:
+        if data is None:
+            data = self._collect_snapshot_data()
+        if not data:
             return None
 
         import pandas as pd
@@ -706,71 +979,78 @@ class SEOSpiderGUI:
             snapshots_dir.mkdir(exist_ok=True)
 
             # Generar nombre único para el archivo
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            domain = self.analyzer.base_url.replace("http://", "").replace("https://", "").split("/")[0]
+            now = datetime.now()
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
+            # El puerto (host:puerto) no es válido en nombres de archivo de Windows
+            domain = (urlparse(data['base_url']).netloc or "site").replace(":", "_")
             filename = snapshots_dir / f"snapshot_{domain}_{timestamp}.xlsx"
 
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                # Detalles por página
-                if self.analyzer.results:
-                    df = pd.DataFrame(self.analyzer.results)
-                    if not df.empty:
-                        # Ordenar por fecha de análisis
-                        if 'Fecha Análisis' in df.columns:
-                            df = df.sort_values('Fecha Análisis', ascending=False)
-                        df.to_excel(writer, sheet_name='Detalles por Página', index=False)
-                        self.log_message(f"   ✓ Guardados detalles de {len(df)} páginas")
-
-                # Imágenes (usar la colección actual del analyzer)
-                if hasattr(self.analyzer, 'images') and self.analyzer.images:
-                    img_df = pd.DataFrame(self.analyzer.images)
-                    # Deduplicar por página origen y URL de imagen
-                    if not img_df.empty:
-                        if 'Página Origen' in img_df.columns and 'URL Imagen' in img_df.columns:
-                            img_df = img_df.drop_duplicates(subset=['Página Origen', 'URL Imagen'])
-                        img_df.to_excel(writer, sheet_name='Imágenes', index=False)
-                        self.log_message(f"   ✓ Guardados detalles de {len(img_df)} imágenes")
-
-                # Enlaces (usar la colección actual del analyzer)
-                if hasattr(self.analyzer, 'links') and self.analyzer.links:
-                    links_df = pd.DataFrame(self.analyzer.links)
-                    if not links_df.empty:
-                        links_df.to_excel(writer, sheet_name='Enlaces Detallados', index=False)
-                        self.log_message(f"   ✓ Guardados detalles de {len(links_df)} enlaces")
-
-                # Resumen detallado
-                try:
-                    total_pages = len(self.analyzer.results)
-                    total_broken = len(self.analyzer.broken_links) if hasattr(self.analyzer, 'broken_links') else 0
-                    total_redirects = len(self.analyzer.redirected_urls) if hasattr(self.analyzer, 'redirected_urls') else 0
-                    total_images = len(self.analyzer.images) if hasattr(self.analyzer, 'images') else 0
-                    total_links = len(self.analyzer.links) if hasattr(self.analyzer, 'links') else 0
-                    
-                    summary = {
-                        'Métrica': [
-                            'Páginas analizadas',
-                            'Imágenes encontradas',
-                            'Enlaces analizados',
-                            'Enlaces rotos',
-                           
-                            'URLs redirigidas',
-                            'Estado',
-                            'Fecha snapshot'
-                        ],
-                        'Valor': [
-                            total_pages,
-                            total_images,
-                            total_links,
-                            total_broken,
-                            total_redirects,
-                            'Parcial' if self.analyzer.to_visit else 'Completo',
-                            datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        ]
-                    }
-                    pd.DataFrame(summary).to_excel(writer, sheet_name='Resumen', index=False)
-                    self.log_message("   ✓ Guardado resumen del análisis")
-                except Exception as e:
-                    self.log_message(f"   ⚠️ Error guardando resumen: {str(e)}")
+            # Hojas del snapshot en orden: (nombre, DataFrame, mensaje para el log)
+            sheets = []
+
+            # Detalles por página
+            if data['results']:
+                df = pd.DataFrame(data['results'])
+                if not df.empty:
+                    # Ordenar por fecha de análisis
+                    if 'Fecha Análisis' in df.columns:
+                        df = df.sort_values('Fecha Análisis', ascending=False)
+                    sheets.append(('Detalles por Página', df, f"   ✓ Guardados detalles de {len(df)} páginas"))
+
+            # Imágenes (ya llegan deduplicadas desde el analyzer)
+            if data['images']:
+                img_df = pd.DataFrame(data['images'])
+                if not img_df.empty:
+                    sheets.append(('Imágenes', img_df, f"   ✓ Guardados detalles de {len(img_df)} imágenes"))
+
+            # Enlaces
+            if data['links']:
+                links_df = pd.DataFrame.from_records(data['links'], columns=LINK_COLUMNS)
+                if not links_df.empty:
+                    sheets.append(('Enlaces Detallados', links_df, f"   ✓ Guardados detalles de {len(links_df)} enlaces"))
+
+            # Resumen detallado
+            try:
+                total_pages = len(data['results'])
+                total_broken = data['total_broken']
+                total_redirects = data['total_redirects']
+                total_images = len(data['images'])
+                total_links = len(data['links'])
+                
+                summary = {
+                    'Métrica': [
+                        'Páginas analizadas',
+                        'Imágenes encontradas',
+                        'Enlaces analizados',
+                        'Enlaces rotos',
+                       
+                        'URLs redirigidas',
+                        'Estado',
+                        'Fecha snapshot'
+                    ],
+                    'Valor': [
+                        total_pages,
+                        total_images,
+                        total_links,
+                        total_broken,
+                        total_redirects,
+                        'Parcial' if data['partial'] else 'Completo',
+                        now.strftime("%Y-%m-%d %H:%M:%S")
+                    ]
+                }
+                sheets.append(('Resumen', pd.DataFrame(summary), "   ✓ Guardado resumen del análisis"))
+            except Exception as e:
+                self.log_message(f"   ⚠️ Error guardando resumen: {str(e)}")
+
+            # Las filas de cada hoja se preparan en paralelo; la escritura del
+            # libro es secuencial (ningún motor admite escribir desde varios hilos)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+                prepared = list(executor.map(self._prepare_rows, [df for _, df, _ in sheets]))
+
+            with self._open_snapshot_writer(filename) as writer:
+                for (sheet_name, _, message), (header, rows) in zip(sheets, prepared):
+                    self._write_sheet(writer, sheet_name, header, rows)
+                    self.log_message(message)
 
             return filename
             
@@ -780,7 +1060,18 @@ class SEOSpiderGUI:
                 error_msg += "\nAsegúrate de que el archivo no esté abierto en Excel."
             self.log_message(error_msg)
             return None
-    
+
+    def _save_snapshot_worker(self, data):
+        """Guarda el snapshot en segundo plano y notifica al hilo de Tk"""
+        path = self.save_snapshot(data)
+        self.root.after(0, lambda p=path: self._on_snapshot_done(p))
+
+    def _on_snapshot_done(self, path):
+        """Informar en el log de la ruta del snapshot guardado"""
+        if path:
+            self.log_message("💾 Resultados parciales guardados en:")
+            self.log_message(f"   {path}")
+
     def stop_analysis(self):
         """Detener el análisis"""
         if not self.analyzer:
@@ -795,28 +1086,24 @@ class SEOSpiderGUI:
             self.is_analyzing = False
             
             # Actualizar estado visual
-            self.progress_label.config(text="⏸️ Análisis pausado...")
+            self._progress_text.set("⏸️ Análisis pausado...")
             self.stop_button.config(text="Reanudar Análisis", state=tk.NORMAL)
             self.export_button.config(state=tk.NORMAL)
-            self.analyze_button.config(state=tk.NORMAL)
+            self.set_analyze_buttons_state(tk.NORMAL)
 
-            # Guardar snapshot
-            snapshot_path = self.save_snapshot()
-            if snapshot_path:
-                self.log_message("💾 Resultados parciales guardados en:")
-                self.log_message(f"   {snapshot_path}")
+            # Guardar snapshot en un hilo aparte para no congelar la interfaz
+            snapshot_data = self._collect_snapshot_data()
+            if snapshot_data:
+                threading.Thread(target=self._save_snapshot_worker, args=(snapshot_data,), daemon=True).start()
                 
             # Mostrar estadísticas
-            total_pages = len(self.analyzer.visited) if hasattr(self.analyzer, 'visited') else 0
-            urls_pending = len(self.analyzer.to_visit) if hasattr(self.analyzer, 'to_visit') else 0
-            elapsed_time = time.time() - self.analyzer.start_time if hasattr(self.analyzer, 'start_time') else 0
-            elapsed_str = f"{int(elapsed_time // 60)}m {int(elapsed_time % 60)}s"
+            stats = self._analysis_stats()
             
-            status = "⏸️ Análisis pausado\n"
-            status += f"   📊 Páginas analizadas: {total_pages}\n"
-            if urls_pending > 0:
-                status += f"   🔄 URLs pendientes: {urls_pending}\n"
-            status += f"   ⏱️ Tiempo transcurrido: {elapsed_str}"
+            lines = ["⏸️ Análisis pausado", f"   📊 Páginas analizadas: {stats.total_pages}"]
+            if stats.urls_pending > 0:
+                lines.append(f"   🔄 URLs pendientes: {stats.urls_pending}")
+            lines.append(f"   ⏱️ Tiempo transcurrido: {stats.elapsed_str}")
+            status = "\n".join(lines)
             self.log_message(status)
             
         except Exception as e:
@@ -824,7 +1111,7 @@ class SEOSpiderGUI:
             # Asegurar que la interfaz quede en estado consistente
             self.is_analyzing = False
             self.stop_button.config(text="Reanudar Análisis", state=tk.NORMAL)
-            self.analyze_button.config(state=tk.NORMAL)
+            self.set_analyze_buttons_state(tk.NORMAL)
 
     def resume_analysis(self):
         """Reanudar un análisis previamente detenido."""
@@ -835,16 +1122,16 @@ class SEOSpiderGUI:
         if not hasattr(self.analyzer, 'to_visit') or not self.analyzer.to_visit:
             messagebox.showinfo("Info", "No hay URLs pendientes para reanudar el análisis.")
             # Actualizar estado visual para reflejar finalización
-            self.progress_label.config(text="✅ Análisis completado")
+            self._progress_text.set("✅ Análisis completado")
             self.stop_button.config(state=tk.DISABLED)
             return
 
         try:
             # Preparar la interfaz
-            self.progress_label.config(text="🔄 Reanudando análisis...")
+            self._progress_text.set("🔄 Reanudando análisis...")
             self.stop_button.config(text="Detener Análisis", state=tk.NORMAL)
             self.export_button.config(state=tk.DISABLED)
-            self.analyze_button.config(state=tk.DISABLED)
+            self.set_analyze_buttons_state(tk.DISABLED)
             
             # Reanudar el crawler (restaurar estado desde el analyzer)
             resumed = False
@@ -858,9 +1145,11 @@ class SEOSpiderGUI:
                 # Asegurar estado de interfaz
                 self.is_analyzing = False
                 self.stop_button.config(text="Reanudar Análisis", state=tk.NORMAL)
-                self.analyze_button.config(state=tk.NORMAL)
+                self.set_analyze_buttons_state(tk.NORMAL)
                 return
             self.is_analyzing = True
+            self._bind_analyzer_state()
+            self.start_progress_animation()
             
             # Mostrar estadísticas de reanudación
             total_pages = len(self.analyzer.visited) if hasattr(self.analyzer, 'visited') else 0
@@ -871,36 +1160,48 @@ class SEOSpiderGUI:
             status += f"   🔄 URLs pendientes: {urls_pending}"
             self.log_message(status)
 
-            # Iniciar thread de análisis
-            thread = threading.Thread(target=self.run_analysis)
-            thread.daemon = True
-            thread.start()
+            # Encolar el análisis en el hilo de trabajo
+            self._jobs.put(self.run_analysis)
             
         except Exception as e:
             self.log_message(f"❌ Error al reanudar el análisis: {str(e)}")
             # Asegurar que la interfaz quede en estado consistente
             self.is_analyzing = False
             self.stop_button.config(text="Reanudar Análisis", state=tk.NORMAL)
-            self.analyze_button.config(state=tk.NORMAL)
+            self.set_analyze_buttons_state(tk.NORMAL)
+
+    def start_progress_animation(self):
+        """Inicia la animación de la barra si no está ya en marcha"""
+        if self._anim_job is None:
+            self.update_progress_animation()
+
+    def stop_progress_animation(self):
+        """Cancela la animación de la barra si está programada"""
+        if self._anim_job is not None:
+            self.root.after_cancel(self._anim_job)
+            self._anim_job = None
 
     def update_progress_animation(self):
         """Actualiza la animación de la barra de progreso"""
-        if hasattr(self, 'progress'):
-            # Solo animar si está en proceso de análisis
-            if self.is_analyzing:
-                # Rotar colores
-                current_color = self.progress_colors[self.progress_animation_frame % len(self.progress_colors)]
-                self.style.configure('Animated.Horizontal.TProgressbar', background=current_color)
-                self.progress_animation_frame += 1
-                
-                # Si está cerca del final, agregar efecto de pulso
-                if self.progress['value'] > 0.9 * self.progress['maximum']:
-                    self.style.configure('Animated.Horizontal.TProgressbar', thickness=16)
-                else:
-                    self.style.configure('Animated.Horizontal.TProgressbar', thickness=15)
+        # Solo animar mientras hay un análisis en curso; en reposo no se
+        # reprograma para no redibujar la barra inútilmente
+        if not self.is_analyzing:
+            self._anim_job = None
+            return
 
-            # Programar siguiente actualización con un intervalo más largo para una transición más suave
-            self.root.after(250, self.update_progress_animation)
+        # Rotar colores
+        current_color = self.progress_colors[self.progress_animation_frame % len(self.progress_colors)]
+        self.style.configure('Animated.Horizontal.TProgressbar', background=current_color)
+        self.progress_animation_frame += 1
+        
+        # Si está cerca del final, agregar efecto de pulso
+        if self._progress_value.get() > 0.9 * self._progress_max:
+            self.style.configure('Animated.Horizontal.TProgressbar', thickness=16)
+        else:
+            self.style.configure('Animated.Horizontal.TProgressbar', thickness=15)
+
+        # Programar siguiente actualización con un intervalo más largo para una transición más suave
+        self._anim_job = self.root.after(250, self.update_progress_animation)
 
     def toggle_pause_resume(self):
         """Toggle entre detener y reanudar análisis."""
@@ -910,10 +1211,12 @@ class SEOSpiderGUI:
             self.resume_analysis()
     
     def log_message(self, message):
-        """Añadir mensaje al log"""
-        self.log_text.insert(tk.END, f"{message}\n")
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
+        """Añadir mensaje al log.
+
+        Seguro desde cualquier hilo: el mensaje se encola y _drain_log lo
+        inserta en el siguiente volcado, sin forzar un redibujado.
+        """
+        self._log_queue.put(message)
     
     def export_report(self):
         """Exportar reporte a Excel"""
@@ -932,14 +1235,50 @@ class SEOSpiderGUI:
             if not confirm:
                 return
 
-        filename = self.analyzer.generate_report(progress_callback=self.log_message)
+        # El diálogo de guardado es de Tk: se muestra aquí, antes de lanzar el hilo
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")],
+            initialfile=self.analyzer.default_report_filename()
+        )
+        if not filename:
+            return
+
+        # Generar el Excel en segundo plano para no congelar la interfaz
+        self.export_button.config(state=tk.DISABLED)
+        self._export_prev_text = self._progress_text.get()
+        self._progress_text.set("📤 Exportando reporte...")
+        threading.Thread(target=self._export_report_worker, args=(self.analyzer, filename), daemon=True).start()
+
+    def _export_report_worker(self, analyzer, filename):
+        """Genera el reporte fuera del hilo de Tk y notifica al terminar"""
+        try:
+            filename = analyzer.generate_report(progress_callback=self.log_message, filename=filename)
+        except Exception as e:
+            self.log_message(f"❌ Error exportando reporte: {str(e)}")
+            filename = None
+        self.root.after(0, lambda f=filename: self._on_export_done(f))
+
+    def _on_export_done(self, filename):
+        """Restaurar la interfaz y abrir la carpeta del reporte generado"""
+        self.export_button.config(state=tk.NORMAL)
+        self._progress_text.set(self._export_prev_text)
         if filename:
             folder_path = os.path.dirname(os.path.abspath(filename))
             messagebox.showinfo("Éxito", f"Reporte guardado como:\n{filename}")
             try:
                 if os.path.exists(folder_path):
-                    os.startfile(folder_path)
+                    self._open_folder(folder_path)
             except Exception as e:
                 self.log_message(f"❌ Error al abrir la carpeta: {str(e)}")
 
+    def _open_folder(self, folder_path):
+        """Abre la carpeta en el explorador del sistema sin esperar a que termine"""
+        if sys.platform == 'win32':
+            subprocess.Popen(["explorer", folder_path])
+        elif sys.platform == 'darwin':
+            subprocess.Popen(["open", folder_path])
+        else:
+            subprocess.Popen(["xdg-open", folder_path])
+
 
@@ -2,38 +2,156 @@
 Módulo para manejar el renderizado de páginas con Playwright.
 """
 import os
+import atexit
 import logging
 import queue
+import re
+import collections
+import functools
+import random
 import time
 from playwright.sync_api import sync_playwright
-from urllib.parse import urlparse
 import threading
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Argumentos de Chromium para un navegador ligero orientado a extraer HTML
+LAUNCH_ARGS = [
+    '--disable-gpu',
+    '--disable-dev-shm-usage',
+    '--renderer-process-limit=2',
+    '--disable-features=Translate,BackForwardCache,AcceptCHFrame',
+    '--js-flags=--max-old-space-size=256',
+]
+
+# Proceso de Playwright y navegador compartidos por todos los manejadores:
+# se lanzan una sola vez y viven hasta que termina el proceso. La API síncrona
+# solo funciona desde el hilo que los lanzó (_OWNER_THREAD)
+_PW = None
+_BROWSER = None
+_OWNER_THREAD = None
+_LOCK = threading.Lock()
+
+
+def _get_shared_browser(headless):
+    """Devuelve el navegador compartido, lanzándolo la primera vez."""
+    global _PW, _BROWSER, _OWNER_THREAD
+    with _LOCK:
+        if _BROWSER is None:
+            _PW = sync_playwright().start()
+            _BROWSER = _PW.chromium.launch(headless=headless, args=LAUNCH_ARGS)
+            _OWNER_THREAD = threading.get_ident()
+        return _BROWSER
+
+
+def shutdown_playwright():
+    """Cierra el navegador y el proceso de Playwright compartidos.
+
+    Debe llamarse desde el hilo que los lanzó; desde cualquier otro (p. ej.
+    el hook de atexit en el hilo principal) no se intenta y el proceso del
+    driver termina junto con el programa.
+    """
+    global _PW, _BROWSER, _OWNER_THREAD
+    with _LOCK:
+        if _BROWSER is None and _PW is None:
+            return
+        if threading.get_ident() != _OWNER_THREAD:
+            logger.debug("Cierre de Playwright omitido: hilo distinto al que lo lanzó")
+            return
+        try:
+            if _BROWSER:
+                _BROWSER.close()
+            if _PW:
+                _PW.stop()
+        except Exception as e:
+            logger.error(f"Error cerrando Playwright compartido: {e}")
+        finally:
+            _BROWSER = None
+            _PW = None
+            _OWNER_THREAD = None
+
+
+# Solo como respaldo: lo normal es cerrar desde el hilo propietario
+atexit.register(shutdown_playwright)
+
 class PlaywrightHandler:
     """Manejador de Playwright para renderizado de páginas dinámicas."""
+
+    # Selectores críticos para el análisis SEO (los únicos que se esperan)
+    CRITICAL_SELECTORS = frozenset(('h1', 'title', 'meta[name="description"]'))
+    # Tipos de recurso que no aportan nada al análisis SEO
+    BLOCKED_RESOURCE_TYPES = frozenset(('image', 'font', 'media', 'stylesheet'))
+    # Hosts de publicidad y analítica: se bloquean siempre, también en capturas
+    _TRACKER_RE = re.compile(r'google-analytics\.com|googletagmanager\.com|doubleclick\.net|'
+                             r'facebook\.(?:net|com)/tr|connect\.facebook\.net|hotjar\.com')
+    # Indicadores de CMS y extensiones dinámicas, compilados una sola vez
+    _CMS_RE = re.compile(r'/wp-(?:content|includes|admin)/|wordpress\.com|wp\.com|drupal|joomla|magento|shopify|wix\.com|squarespace')
+    _EXTS = ('.html', '.php', '.aspx', '.jsp')
+    # Opciones comunes a todos los contextos. Para extraer HTML basta una
+    # ventana pequeña (menos superficie de composición y raster por página)
+    CONTEXT_OPTIONS = {
+        'viewport': {'width': 800, 'height': 600},
+        'device_scale_factor': 1,
+        'has_touch': False,
+        'is_mobile': False,
+        'ignore_https_errors': True,  # Permitir certificados SSL inválidos
+        'bypass_csp': True,
+        'service_workers': 'block',  # Sin service workers: no cachean ni interceptan nada
+        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36',
+    }
+    # Las capturas sí se hacen a resolución completa, en un contexto aparte
+    SCREENSHOT_VIEWPORT = {'width': 1920, 'height': 1080}
+    # Usos y antigüedad máxima (segundos) de una página antes de reemplazarla
+    PAGE_MAX_USES = 50
+    PAGE_MAX_AGE = 600
+    # Tamaño a partir del cual no merece la pena renderizar
+    RENDER_MAX_LENGTH = 5 * 1024 * 1024
+    # Errores de navegación transitorios: solo estos se reintentan
+    RETRYABLE_ERRORS = ('Timeout', 'ERR_CONNECTION_RESET', 'ERR_NETWORK_CHANGED', 'ERR_EMPTY_RESPONSE',
+                        'ERR_CONNECTION_CLOSED', 'ERR_TIMED_OUT')
     
-    def __init__(self, headless=True, timeout=30):
+    def __init__(self, headless=True, timeout=30, extra_stability_wait=0, concurrency=8, block_resources=True,
+                 shared_browser=True):
         """
         Inicializa el manejador de Playwright.
         
         Args:
             headless (bool): Si se debe ejecutar en modo headless
             timeout (int): Tiempo máximo de espera para cargar la página (en segundos, default 30)
+            extra_stability_wait (float): Espera fija tras la carga (en segundos, default 0 = desactivada)
+            concurrency (int): Páginas precreadas en el pool (default 8)
+            block_resources (bool): Abortar imágenes, fuentes, media y CSS (default True)
+            shared_browser (bool): Usar el navegador compartido del módulo (default True).
+                Debe ser False si el manejador se usa desde un hilo distinto al que lo lanzó.
         """
         self.headless = headless
         self.timeout = timeout
+        self.extra_stability_wait = extra_stability_wait
+        self.block_resources = block_resources
+        # Contexto de capturas, creado solo la primera vez que se necesita
+        self._screenshot_context = None
+        self.shared_browser = shared_browser
         self.browser = None
         self.context = None
         self.is_initialized = False
+        self._init_lock = threading.Lock()
         # Límite de páginas concurrentes manejadas por Playwright (aumentado para paralelismo)
-        self.max_concurrent_pages = 8
-        self._page_semaphore = threading.Semaphore(self.max_concurrent_pages)
-        # Pool de páginas reutilizables para reciclado inteligente
-        self._page_pool = queue.Queue(maxsize=self.max_concurrent_pages)
+        self.max_concurrent_pages = concurrency
+        # Pool de páginas reutilizables: tomar una página del pool es el permiso
+        # para navegar, así que su tamaño es el límite de concurrencia. Cada
+        # página que sale vuelve una sola vez, así que basta una deque con una
+        # única Condition (sin not_full)
+        self._page_pool = collections.deque()
+        self._pool_cv = threading.Condition()
+        # Sesión CDP de cada página del pool. Las cookies no se limpian por
+        # página (Network.clearBrowserCookies vacía todo el contexto, también
+        # las de otras páginas en plena navegación): se comparten durante el
+        # rastreo, como en un navegador normal
+        self._cdp_sessions = {}
+        # [usos, instante de creación] de cada página, para reciclarlas
+        self._page_stats = {}
         # Número de reintentos en navegación (reducido para performance)
         self.nav_retries = 1
         # Backoff base en segundos (reducido)
@@ -49,62 +167,180 @@ class PlaywrightHandler:
         self.close()
         
     def initialize(self):
-        """Inicializar el navegador y contexto de Playwright."""
+        """Inicializar el navegador y contexto de Playwright (seguro entre hilos)."""
         if self.is_initialized:
             return
-        try:
-            self.playwright = sync_playwright().start()
-            self.browser = self.playwright.chromium.launch(headless=self.headless)
-            self.context = self.browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                ignore_https_errors=True,  # NUEVO: Permitir certificados SSL inválidos
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/116.0.0.0 Safari/537.36'
-            )
-            # Precrear un pequeño pool de páginas para reciclar
+        # Doble comprobación: solo un hilo lanza el navegador y llena el pool
+        with self._init_lock:
+            if self.is_initialized:
+                return
             try:
-                for _ in range(self.max_concurrent_pages):
-                    p = self.context.new_page()
-                    # Navegar a about:blank para tener una página limpia
-                    try:
-                        p.goto('about:blank', timeout=5000)
-                    except Exception:
-                        pass
-                    self._page_pool.put(p)
-            except Exception:
-                # Si falla la creación del pool, vaciar cualquier página parcial
-                while not self._page_pool.empty():
-                    try:
-                        page = self._page_pool.get_nowait()
-                        try:
-                            page.close()
-                        except Exception:
-                            pass
-                    except Exception:
-                        break
+                if self.shared_browser:
+                    # Solo se crea un contexto propio sobre el navegador compartido
+                    self.browser = _get_shared_browser(self.headless)
+                else:
+                    self.playwright = sync_playwright().start()
+                    self.browser = self.playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+                # Un único contexto para todo el rastreo
+                self.context = self._new_context()
+                # Pool de páginas. Solo se precrea la primera; el resto de huecos
+                # (None) se llena al primer uso, así el arranque no espera a
+                # crear todo el pool
+                try:
+                    for i in range(self.max_concurrent_pages):
+                        self._pool_put(self._new_page() if i == 0 else None)
+                except Exception:
+                    # Si falla la creación del pool, vaciar cualquier página parcial
+                    with self._pool_cv:
+                        while self._page_pool:
+                            page = self._page_pool.popleft()
+                            try:
+                                if page:
+                                    page.close()
+                            except Exception:
+                                pass
 
-            self.is_initialized = True
+                self.is_initialized = True
 
-        except Exception as e:
-            logger.error(f"Error inicializando Playwright: {e}")
-            self.close()
-            raise
+            except Exception as e:
+                logger.error(f"Error inicializando Playwright: {e}")
+                self.close()
+                raise
             
     def close(self):
-        """Cerrar y limpiar recursos de Playwright."""
+        """Cerrar y limpiar recursos de Playwright.
+
+        Con el navegador compartido solo se cierra el contexto propio; el
+        navegador se libera con shutdown_playwright desde el hilo que lo lanzó.
+        """
+        # Las páginas del pool pertenecen al contexto que se va a cerrar
+        with self._pool_cv:
+            self._page_pool.clear()
+        self._cdp_sessions.clear()
+        self._page_stats.clear()
         try:
             if self.context:
                 self.context.close()
-            if self.browser:
-                self.browser.close()
-            if hasattr(self, 'playwright'):
-                self.playwright.stop()
+            if self._screenshot_context:
+                self._screenshot_context.close()
+            if not self.shared_browser:
+                if self.browser:
+                    self.browser.close()
+                if hasattr(self, 'playwright'):
+                    self.playwright.stop()
         except Exception as e:
             logger.error(f"Error cerrando Playwright: {e}")
         finally:
             self.is_initialized = False
             self.context = None
+            self._screenshot_context = None
             self.browser = None
             
+    def _new_context(self):
+        """Crea un contexto con las opciones comunes y el filtro de recursos."""
+        context = self.browser.new_context(**self.CONTEXT_OPTIONS)
+        # Filtrar recursos a nivel de red (se consulta block_resources en cada petición)
+        context.route("**/*", self._route_filter)
+        return context
+
+    def _get_screenshot_context(self):
+        """Contexto a resolución completa para capturas, creado bajo demanda."""
+        if self._screenshot_context is None:
+            options = dict(self.CONTEXT_OPTIONS, viewport=self.SCREENSHOT_VIEWPORT)
+            self._screenshot_context = self.browser.new_context(**options)
+            # Las capturas necesitan la página completa: solo se bloquean rastreadores
+            self._screenshot_context.route("**/*", self._route_trackers)
+        return self._screenshot_context
+
+    def _pool_get(self, timeout):
+        """Saca una entrada del pool esperando como máximo timeout segundos."""
+        with self._pool_cv:
+            if not self._pool_cv.wait_for(lambda: self._page_pool, timeout):
+                raise queue.Empty
+            return self._page_pool.popleft()
+
+    def _pool_put(self, page):
+        """Devuelve una entrada al pool y despierta a un hilo en espera."""
+        with self._pool_cv:
+            self._page_pool.append(page)
+            self._pool_cv.notify()
+
+    def _new_page(self):
+        """Crea una página en el contexto y registra su creación."""
+        page = self.context.new_page()
+        self._page_stats[page] = [0, time.monotonic()]
+        return page
+
+    def _checkout_page(self, timeout):
+        """Toma una página del pool (lanza queue.Empty si no hay ninguna libre).
+
+        Los huecos aún sin página se rellenan aquí.
+        """
+        page = self._pool_get(timeout)
+        if page is None:
+            try:
+                page = self._new_page()
+            except Exception as e:
+                # Devolver el hueco para no perder el permiso
+                self._pool_put(None)
+                logger.warning("No se pudo crear una página en el pool: %s", e)
+                raise queue.Empty from e
+        self._page_stats.setdefault(page, [0, time.monotonic()])[0] += 1
+        return page
+
+    def _checkin_page(self, page, reset):
+        """Devuelve la página al pool tras aplicarle reset(page).
+
+        Si el reset falla o la página superó PAGE_MAX_USES / PAGE_MAX_AGE, se
+        cierra y se sustituye por una nueva, sin perder el permiso.
+        """
+        uses, born = self._page_stats.get(page, (0, time.monotonic()))
+        healthy = uses < self.PAGE_MAX_USES and time.monotonic() - born <= self.PAGE_MAX_AGE
+        if not healthy:
+            logger.debug("Página reciclada tras %s usos y %.0fs", uses, time.monotonic() - born)
+        else:
+            try:
+                reset(page)
+            except Exception:
+                healthy = False
+        if not healthy:
+            self._forget_page(page)
+            try:
+                page.close()
+            except Exception:
+                pass
+            try:
+                page = self._new_page()
+            except Exception as e:
+                # Devolver el hueco vacío: _checkout_page creará la página al
+                # siguiente uso y el pool no pierde el permiso
+                logger.warning("No se pudo crear una página en el pool: %s", e)
+                page = None
+        self._pool_put(page)
+
+    def _route_filter(self, route):
+        """Aborta las peticiones de recursos no necesarios para el HTML."""
+        try:
+            request = route.request
+            if self._TRACKER_RE.search(request.url):
+                route.abort()
+            elif self.block_resources and request.resource_type in self.BLOCKED_RESOURCE_TYPES:
+                route.abort()
+            else:
+                route.continue_()
+        except Exception:
+            pass
+
+    def _route_trackers(self, route):
+        """Aborta solo las peticiones a rastreadores (contexto de capturas)."""
+        try:
+            if self._TRACKER_RE.search(route.request.url):
+                route.abort()
+            else:
+                route.continue_()
+        except Exception:
+            pass
+
     def _should_use_playwright(self, url, content_length=None, content_type=None):
         """
         Determina si una URL debe ser procesada con Playwright.
@@ -117,21 +353,28 @@ class PlaywrightHandler:
         Returns:
             bool: True si se debe usar Playwright
         """
-        try:
-            if content_type and 'text/html' in content_type.lower():
-                return True
+        return self._should_use_playwright_cached(url, content_length, content_type)
 
-            parsed = urlparse(url.lower())
-            path = parsed.path
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _should_use_playwright_cached(url, content_length, content_type):
+        """Implementación cacheada de _should_use_playwright (las URLs se repiten mucho)."""
+        try:
+            if content_type:
+                content_type = content_type.casefold()
+                if 'text/html' in content_type:
+                    return True
 
-            cms_indicators = [
-                '/wp-content/', '/wp-includes/', '/wp-admin/', 'wordpress.com', 'wp.com',
-                'drupal', 'joomla', 'magento', 'shopify', 'wix.com', 'squarespace'
-            ]
-            if any(ind in url.lower() for ind in cms_indicators):
+            url_l = url.lower()
+            if PlaywrightHandler._CMS_RE.search(url_l):
                 return True
 
-            if path.endswith(('.html', '.php', '.aspx', '.jsp')):
+            # Ruta extraída por corte de cadena (sin construir un ParseResult)
+            base = url_l.split('?', 1)[0].split('#', 1)[0]
+            start = base.find('://')
+            i = base.find('/', start + 3 if start != -1 else 0)
+            path = base[i:] if i != -1 else ''
+            if path.endswith(PlaywrightHandler._EXTS):
                 return True
 
             if content_length is not None:
@@ -146,6 +389,24 @@ class PlaywrightHandler:
         except Exception:
             return False
             
+    def is_renderable(self, url, content_type=None, content_length=None):
+        """Indica si merece la pena abrir url en el navegador.
+
+        Usa el content-type y content-length ya conocidos por quien llama: se
+        descartan los recursos que no son HTML/XML y los mayores de
+        RENDER_MAX_LENGTH. Si no se conoce nada se renderiza.
+        """
+        if content_type:
+            content_type = content_type.casefold()
+            if 'html' not in content_type and 'xml' not in content_type:
+                return False
+        try:
+            if content_length is not None and int(content_length) > self.RENDER_MAX_LENGTH:
+                return False
+        except (ValueError, TypeError):
+            pass
+        return True
+
     def get_page_content(self, url, wait_for_selectors=None, post_load_wait=0):
         """
         Obtiene el contenido renderizado de una página usando Playwright.
@@ -158,60 +419,37 @@ class PlaywrightHandler:
         Returns:
             tuple: (content, status_code)
         """
-        # Control de concurrencia: intentar adquirir permiso para abrir/usar una página
-        acquired = False
-        try:
-            acquired = self._page_semaphore.acquire(timeout=30)
-        except Exception:
-            acquired = False
-
-        if not acquired:
-            logger.warning(f"No se pudo adquirir permiso para abrir página (timeout): {url}")
-
         if not self.is_initialized:
             self.initialize()
 
-        page = None
+        # Control de concurrencia: la página obtenida del pool es el permiso
+        try:
+            page = self._checkout_page(timeout=30)
+        except queue.Empty:
+            logger.warning("No hay páginas libres en el pool (timeout): %s", url)
+            return None, 500
+
         content = None
         status_code = 500
 
         try:
-            # Obtener una página del pool (reutilizable)
-            try:
-                page = self._page_pool.get(timeout=20)
-            except Exception:
-                # Si no hay página en el pool, crear una nueva de forma segura
-                try:
-                    page = self.context.new_page()
-                except Exception as e:
-                    logger.error(f"No se pudo crear una nueva página: {e}")
-                    return None, 500
-
             # Intentar la navegación con reintentos y backoff (OPTIMIZADO)
             response = None
             last_exc = None
             for attempt in range(1, self.nav_retries + 2):
                 try:
-                    # Cambio: usar 'load' en lugar de 'networkidle' para rendimiento
-                    # 'load' espera event DOMContentLoaded + carga de recursos principales
-                    response = page.goto(url, wait_until='load', timeout=self.timeout * 1000)
+                    # 'domcontentloaded': para el análisis SEO basta con el DOM
+                    # parseado, sin esperar imágenes, hojas de estilo ni iframes
+                    response = page.goto(url, wait_until='domcontentloaded', timeout=self.timeout * 1000)
                     # si navegó sin excepción, romper
                     break
                 except Exception as e:
                     last_exc = e
-                    logger.debug(f"⚠️ Intento {attempt} - error en load ({url}): {e}")
-                    # reintentar con domcontentloaded una sola vez
-                    if attempt == 1:
-                        try:
-                            response = page.goto(url, wait_until='domcontentloaded', timeout=15000)
-                            logger.debug(f"✔️ Reintento con domcontentloaded exitoso ({url})")
-                            break
-                        except Exception as e2:
-                            last_exc = e2
-                            logger.debug(f"Fallo domcontentloaded: {e2}")
-                    # esperar backoff mínimo antes del siguiente intento
-                    if attempt <= self.nav_retries:
-                        time.sleep(self.nav_backoff * 0.5)
+                    logger.debug("⚠️ Intento %s - error en domcontentloaded (%s): %s", attempt, url, e)
+                    # Errores definitivos (DNS, certificados...): sin reintento ni espera
+                    if attempt > self.nav_retries or not self._is_retryable(e):
+                        break
+                    self._backoff(attempt)
 
             if not response:
                 logger.error(f"Navegación fallida tras {self.nav_retries + 1} intentos: {last_exc}")
@@ -219,21 +457,24 @@ class PlaywrightHandler:
 
             status_code = response.status
 
-            # OPTIMIZADO: Esperar solo selectores críticos (reducidos de 7 a 2)
-            if wait_for_selectors:
-                # Priorizar solo selectores críticos para análisis SEO
-                critical_selectors = [sel for sel in wait_for_selectors if sel in ['h1', 'title', 'meta[name="description"]']]
-                for selector in critical_selectors[:2]:  # Máximo 2 selectores
-                    try:
-                        page.wait_for_selector(selector, timeout=2000)
-                    except Exception:
-                        logger.debug(f"No se encontró el selector: {selector}")
-
-            # OPTIMIZADO: Reducida de 2000ms a 500ms - solo para permitir JS mínimo
+            # OPTIMIZADO: Esperar solo selectores críticos, junto con h1/title
+            # (nodos clave del DOM) en un único predicado evaluado en la página:
+            # una sola ida y vuelta y, como mucho, un único timeout
+            critical_selectors = [sel for sel in (wait_for_selectors or ()) if sel in self.CRITICAL_SELECTORS]
+            selectors = list(dict.fromkeys(critical_selectors + ['h1', 'title']))
             try:
-                page.wait_for_timeout(500)
+                page.wait_for_function("sels => sels.some(s => document.querySelector(s))",
+                                       arg=selectors, timeout=2000)
             except Exception:
-                pass
+                logger.debug("No se encontró ninguno de los selectores %s: %s", selectors, url)
+
+            # Espera fija opcional: por defecto no se duerme tras la carga, basta
+            # con los eventos de navegación y los selectores críticos
+            if self.extra_stability_wait:
+                try:
+                    page.wait_for_timeout(self.extra_stability_wait * 1000)
+                except Exception:
+                    pass
 
             # OPTIMIZADO: Eliminada espera post_load_wait por defecto (no requerida)
             # Solo incluida si es realmente necesaria para casos especiales
@@ -243,17 +484,14 @@ class PlaywrightHandler:
                 except Exception:
                     pass
 
-            # ELIMINADA: Detección de contenido principal - innecesaria para análisis SEO rápido
-            # El contenido está disponible tras 'load' event
-
             # Obtener el HTML resultante
             try:
-                content = page.content()
+                content = self._get_html(page)
             except Exception as e:
-                logger.warning(f"No se pudo obtener contenido de la página ({url}): {e}")
+                logger.warning("No se pudo obtener contenido de la página (%s): %s", url, e)
 
             if not content or not str(content).strip():
-                logger.warning(f"⚠️ HTML vacío tras renderizado: {url}")
+                logger.warning("⚠️ HTML vacío tras renderizado: %s", url)
 
             return content, status_code
 
@@ -261,38 +499,60 @@ class PlaywrightHandler:
             logger.error(f"Error obteniendo contenido con Playwright: {e}")
             return None, 500
         finally:
-            # En lugar de cerrar la página, intentar dejarla en estado reutilizable y devolver al pool
-            try:
-                if page:
-                    try:
-                        # OPTIMIZADO: Reset más rápido - solo limpiar sin navegar
-                        # (about:blank añade latencia innecesaria)
-                        page.evaluate('() => window.location.href = "about:blank"')
-                    except Exception:
-                        try:
-                            page.close()
-                            # reemplazar la página al crear una nueva
-                            page = self.context.new_page()
-                        except Exception:
-                            page = None
-                    # Devolver al pool si la página es válida
-                    if page:
-                        try:
-                            self._page_pool.put_nowait(page)
-                        except Exception:
-                            try:
-                                page.close()
-                            except Exception:
-                                pass
-            except Exception:
-                pass
-            # Liberar el semáforo si lo adquirimos
+            # En lugar de cerrar la página, dejarla en estado reutilizable y
+            # devolverla al pool (reset ligero por CDP, sin navegar a about:blank)
             try:
-                if acquired:
-                    self._page_semaphore.release()
-            except Exception:
-                pass
+                self._checkin_page(page, self._soft_reset)
+            except Exception as e:
+                logger.error(f"No se pudo devolver la página al pool: {e}")
             
+    def _is_retryable(self, exc):
+        """Indica si un error de navegación es transitorio y merece otro intento."""
+        if type(exc).__name__ == 'TimeoutError':
+            return True
+        message = str(exc)
+        return any(token in message for token in self.RETRYABLE_ERRORS)
+
+    def _backoff(self, attempt):
+        """Espera exponencial con jitter antes del siguiente intento."""
+        time.sleep(random.uniform(0.5, 1.5) * self.nav_backoff * (2 ** (attempt - 1)))
+
+    def _cdp_session(self, page):
+        """Sesión CDP de la página, creada una sola vez y reutilizada."""
+        session = self._cdp_sessions.get(page)
+        if session is None:
+            session = page.context.new_cdp_session(page)
+            self._cdp_sessions[page] = session
+        return session
+
+    def _forget_page(self, page):
+        """Olvida el estado asociado a una página que deja el pool."""
+        self._cdp_sessions.pop(page, None)
+        self._page_stats.pop(page, None)
+
+    def _get_html(self, page):
+        """HTML de la página leído por la sesión CDP ya abierta.
+
+        Si la lectura por CDP falla se recurre a page.content().
+        """
+        try:
+            result = self._cdp_session(page).send("Runtime.evaluate", {
+                "expression": "document.documentElement ? document.documentElement.outerHTML : ''",
+                "returnByValue": True,
+            })
+            html = result.get('result', {}).get('value')
+            if html is not None:
+                return html
+        except Exception as e:
+            logger.debug("Lectura de HTML por CDP fallida: %s", e)
+        return page.content()
+
+    def _soft_reset(self, page):
+        """Detiene la carga y vacía el DOM sin una navegación completa."""
+        session = self._cdp_session(page)
+        session.send("Page.stopLoading")
+        session.send("Runtime.evaluate", {"expression": "document.open();document.close()"})
+
     def get_page_screenshot(self, url, path=None):
         """
         Toma una captura de pantalla de la página.
@@ -304,48 +564,37 @@ class PlaywrightHandler:
         Returns:
             bytes: Datos de la imagen si path es None, sino None
         """
-        # Control de concurrencia similar a get_page_content
-        acquired = False
-        try:
-            acquired = self._page_semaphore.acquire(timeout=30)
-        except Exception:
-            acquired = False
-
-        if not acquired:
-            logger.warning(f"No se pudo adquirir permiso para captura de página (timeout): {url}")
-
         if not self.is_initialized:
             self.initialize()
 
-        page = None
+        # Control de concurrencia igual que en get_page_content: la página del
+        # pool solo actúa como permiso, la captura se hace en su propio contexto
         try:
-            try:
-                page = self._page_pool.get(timeout=20)
-            except Exception:
-                page = self.context.new_page()
+            slot = self._checkout_page(timeout=30)
+        except queue.Empty:
+            logger.warning("No hay páginas libres en el pool para la captura (timeout): %s", url)
+            return None
 
+        page = None
+        try:
+            page = self._get_screenshot_context().new_page()
             # Reintentos simples para la navegación
             last_exc = None
             for attempt in range(1, self.nav_retries + 2):
                 try:
-                    page.goto(url, wait_until='networkidle', timeout=self.timeout * 1000)
+                    page.goto(url, wait_until='load', timeout=self.timeout * 1000)
                     break
                 except Exception as e:
                     last_exc = e
-                    logger.warning(f"Intento {attempt} para screenshot falló: {e}")
-                    if attempt <= self.nav_retries:
-                        time.sleep(self.nav_backoff * attempt)
+                    logger.warning("Intento %s para screenshot falló: %s", attempt, e)
+                    if attempt > self.nav_retries or not self._is_retryable(e):
+                        break
+                    self._backoff(attempt)
 
             if last_exc and not page:
                 logger.error(f"No se pudo obtener página para screenshot: {last_exc}")
                 return None
 
-            # Asegurar carga mínima
-            try:
-                page.wait_for_load_state('networkidle')
-            except Exception:
-                pass
-
             if path:
                 page.screenshot(path=path, full_page=True)
                 return None
@@ -357,26 +606,12 @@ class PlaywrightHandler:
             logger.error(f"Error tomando captura: {e}")
             return None
         finally:
+            if page:
+                try:
+                    page.close()
+                except Exception:
+                    pass
             try:
-                if page:
-                    try:
-                        page.goto('about:blank', timeout=5000)
-                    except Exception:
-                        try:
-                            page.close()
-                        except Exception:
-                            pass
-                    try:
-                        self._page_pool.put_nowait(page)
-                    except Exception:
-                        try:
-                            page.close()
-                        except Exception:
-                            pass
-            except Exception:
-                pass
-            try:
-                if acquired:
-                    self._page_semaphore.release()
-            except Exception:
-                pass
+                self._checkin_page(slot, lambda p: None)
+            except Exception as e:
+                logger.error(f"No se pudo devolver la página al pool: {e}")
@@ -3,11 +3,15 @@ Módulo principal del analizador SEO - VERSIÓN SIMPLIFICADA
 Contiene la lógica básica de análisis y rastreo de sitios web.
 """
 
+import codecs
 import os
+import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from collections import deque
+from urllib.parse import urljoin, urlparse, parse_qsl, urlencode
+from collections import Counter, deque
 import time
 import pandas as pd
 from datetime import datetime
@@ -16,6 +20,7 @@ from tkinter import filedialog
 from .playwright_handler import PlaywrightHandler
 import urllib3
 import concurrent.futures
+import functools
 import math
 
 # Suprimir advertencias de SSL cuando intentionalmente usamos verify=False
@@ -25,6 +30,120 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Columnas de los registros de enlaces: cada enlace se guarda como una tupla
+# en este orden (mucho más ligera que un dict por enlace)
+LINK_COLUMNS = (
+    'Source Page', 'Source Domain', 'Target URL', 'Target Domain', 'Domain Authority',
+    'Link Type', 'Anchor Text', 'Status', 'Status Code'
+)
+
+# Filtros de is_valid_url como tuplas: startswith/endswith las aceptan
+# directamente y comprueban todas las opciones en C
+_INVALID_PROTOS = ('mailto:', 'tel:', 'javascript:', 'data:')
+_IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.gif', '.ico', '.svg', '.webp')
+_EXCLUDED_EXTS = _IMAGE_EXTS + (
+    # Documentos
+    '.pdf',
+    # Recursos web
+    '.css', '.js', '.json', '.xml', '.txt',
+    # Fuentes
+    '.woff', '.woff2', '.ttf', '.eot', '.otf',
+    # Media
+    '.mp3', '.mp4', '.wav', '.ogg', '.webm',
+    # Recursos estáticos
+    '.map',
+)
+# Parámetros de campaña que no cambian la página: se eliminan al normalizar
+_TRACKING_PREFIXES = ('utm_',)
+_TRACKING_PARAMS = frozenset(('gclid', 'fbclid', 'msclkid'))
+_STATIC_PATTERNS = ('/_next/static/', '/static/', '/assets/', '/dist/', '/build/', '/themes/')
+
+# Extracción de palabras clave
+_WORD_RE = re.compile(r'\b\w+\b')
+_STOPWORDS = frozenset({
+    'de', 'la', 'que', 'el', 'en', 'y', 'a', 'los', 'del', 'las', 'un', 'por', 'con', 'una',
+    'su', 'para', 'es', 'al', 'lo', 'como', 'más', 'o', 'pero', 'sus', 'le', 'ha', 'me', 'si',
+    'sin', 'sobre', 'este', 'ya', 'entre', 'cuando', 'todo', 'esta', 'ser', 'son', 'dos', 'también',
+    'fue', 'había', 'era', 'muy', 'años', 'hasta', 'desde', 'está', 'mi', 'porque', 'qué', 'sólo',
+    'han', 'yo', 'hay', 'vez', 'puede', 'todos', 'así', 'nos', 'ni', 'parte', 'tiene', 'él',
+    'the', 'and', 'to', 'of', 'in', 'for', 'is', 'on', 'that', 'by', 'this', 'with', 'i', 'you',
+    'it', 'not', 'or', 'be', 'are', 'from', 'at', 'as', 'your', 'all', 'have', 'new', 'more',
+    'an', 'was', 'we', 'will', 'can', 'us', 'about', 'if', 'my', 'has', 'but', 'our', 'one',
+    'other', 'do', 'no', 'they', 'he', 'may', 'what', 'which', 'their', 'any', 'there', 'who',
+})
+
+# Subcadenas de class/id que delatan un H1 o el contenedor principal
+_H1_CLASS_CANDIDATES = ('title', 'page-title', 'heading', 'hero-title', 'site-title', 'titulo', 'titulo-pagina')
+_MAIN_CANDIDATES = ('content', 'main', 'page', 'site', 'wrap', 'container', 'app', 'region', 'contenido')
+
+
+def _scan_attr_candidates(soup, attrs, candidates, first_only=False):
+    """Primer tag, en orden de documento, cuyo atributo contiene cada candidato.
+
+    Recorre el árbol una sola vez (en lugar de un find por combinación) y
+    devuelve {(atributo, candidato): tag}. Con first_only se detiene en
+    cuanto aparece la combinación de mayor prioridad (attrs[0], candidates[0]).
+    """
+    found = {}
+    total = len(attrs) * len(candidates)
+    top = (attrs[0], candidates[0])
+    for tag in soup.find_all(True):
+        for attr in attrs:
+            value = tag.get(attr)
+            if not value:
+                continue
+            if isinstance(value, list):
+                value = ' '.join(value)
+            value = value.lower()
+            for cand in candidates:
+                if cand in value and (attr, cand) not in found:
+                    found[(attr, cand)] = tag
+        if len(found) == total or (first_only and top in found):
+            break
+    return found
+
+
+@functools.lru_cache(maxsize=100_000)
+def _cached_urlparse(url):
+    """urlparse memoizado: cada URL se analiza varias veces por página."""
+    return urlparse(url)
+
+
+@functools.lru_cache(maxsize=100_000)
+def _cached_urljoin(base, href):
+    """urljoin memoizado: los enlaces de menú y pie se repiten en cada página."""
+    return urljoin(base, href)
+
+
+@functools.lru_cache(maxsize=100_000)
+def _normalize(url):
+    """URL sin fragmento, con esquema y host en minúsculas y sin parámetros de seguimiento."""
+    parsed = urlparse(url.strip())
+    query = parsed.query
+    if query:
+        pairs = parse_qsl(query, keep_blank_values=True)
+        kept = [(k, v) for k, v in pairs
+                if not k.lower().startswith(_TRACKING_PREFIXES) and k.lower() not in _TRACKING_PARAMS]
+        # Solo se recodifica la query si realmente se ha quitado algo
+        if len(kept) != len(pairs):
+            query = urlencode(kept)
+    return parsed._replace(scheme=parsed.scheme.lower(), netloc=parsed.netloc.lower(),
+                           query=query, fragment='').geturl()
+
+
+@functools.lru_cache(maxsize=100_000)
+def _domain_key(url):
+    """Dominio en minúsculas y sin 'www.', usado para comparar dominios."""
+    return urlparse(url.lower()).netloc.replace('www.', '')
+
+
+def _parse_html(content):
+    """Parsea HTML con lxml (C, mucho más rápido) y recurre a html.parser si falla."""
+    try:
+        return BeautifulSoup(content, 'lxml')
+    except Exception:
+        return BeautifulSoup(content, 'html.parser')
+
 
 # Funciones helper para detección inteligente
 def is_cloudflare_challenge(html_content, status_code):
@@ -56,7 +175,7 @@ def is_skeleton_html(html_content):
     if not html_content or len(html_content.strip()) < 100:
         return False
     
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = _parse_html(html_content)
     
     # Contar elementos significativos
     try:
@@ -107,6 +226,13 @@ def validate_extraction(soup):
 
 class SEOAnalyzer:
     """Analizador SEO para sitios web."""
+
+    # Hilos para verificar en paralelo el estado de los enlaces de una página
+    LINK_CHECK_WORKERS = 16
+    # Hilos para las peticiones HEAD de las imágenes de una página
+    IMAGE_CHECK_WORKERS = 16
+    # Máximo de bytes de HTML leídos por página (el resto se descarta)
+    MAX_HTML_BYTES = 2_000_000
     
     def __init__(self, base_url, max_pages=1, delay=1, specific_urls=None, analyze_images=True, analyze_links=True, headless_mode=False):
         """
@@ -126,11 +252,16 @@ class SEOAnalyzer:
         self.analyze_images = analyze_images
         self.analyze_links = analyze_links
         self.headless_mode = headless_mode
+        # Dominio base calculado una sola vez (se compara con cada enlace)
+        self._base_domain = _domain_key(base_url) if base_url else ''
         
         # Colecciones de datos
         self.visited = set()
         self.to_visit = deque(specific_urls if specific_urls else [base_url])
-        self.specific_urls = set(specific_urls) if specific_urls else None
+        # URLs que han pasado alguna vez por la cola (evita recorrer la deque)
+        self._queued = set(self.to_visit)
+        # Normalizadas igual que las URLs que se sacan de la cola
+        self.specific_urls = {self._normalize_url(u) for u in specific_urls} if specific_urls else None
         self.results = []
         self.is_running = True
         self.start_time = None
@@ -146,9 +277,10 @@ class SEOAnalyzer:
         
         # Colección para imágenes
         self.images = []      # Lista de diccionarios con datos de imágenes
+        self._image_keys = set()  # (página origen, URL imagen) ya registradas
         
         # Colección para enlaces
-        self.links = []      # Lista de diccionarios con datos de enlaces
+        self.links = []      # Lista de tuplas con datos de enlaces (ver LINK_COLUMNS)
         # Estado de enlaces rotos y redirecciones
         self.broken_links = []
         self.redirected_urls = []
@@ -159,6 +291,11 @@ class SEOAnalyzer:
         # Cache de estado de URLs para evitar HEAD/GET duplicados
         # key: url -> value: status_code (int) or special codes like 'ERROR', 'TIMEOUT'
         self.url_status_cache = {}
+        # Resultado de _check_link_status por URL: cada enlace se verifica una
+        # sola vez por análisis aunque aparezca en todas las páginas (menús, pie)
+        self._link_status_cache = {}
+        # (estado, tipo, peso) por URL de imagen: las del tema/CDN se repiten en cada página
+        self._image_probe_cache = {}
         # Circuit breaker por dominio: {domain: {'fails': int, 'last_fail_ts': float, 'open_until': float}}
         self.domain_failures = {}
         self.circuit_failure_threshold = 3
@@ -175,25 +312,35 @@ class SEOAnalyzer:
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
         })
+        # Pool de conexiones dimensionado para los hilos de verificación: sin él
+        # urllib3 descarta conexiones por encima de 10 y se pierde el keep-alive.
+        # Solo reintenta respuestas 502/503/504; los errores de red los reintenta
+        # _request_with_retry
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=2, connect=0, read=0, backoff_factor=0.3,
+                              status_forcelist=[502, 503, 504], raise_on_status=False),
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
     
     def is_same_domain(self, url1, url2):
         """Compara si dos URLs pertenecen al mismo dominio.""" 
         try:
-            parsed1 = urlparse(url1.lower())
-            parsed2 = urlparse(url2.lower())
-            domain1 = parsed1.netloc.replace('www.', '')
-            domain2 = parsed2.netloc.replace('www.', '')
-            return domain1 == domain2
+            return _domain_key(url1) == _domain_key(url2)
         except Exception:
             return False
 
     def _normalize_url(self, url):
-        """Normaliza una URL removiendo fragmentos y espacios innecesarios."""
+        """Normaliza una URL removiendo fragmentos y espacios innecesarios.
+
+        También pasa esquema y host a minúsculas y quita los parámetros de
+        campaña (utm_*, gclid, fbclid...), para que variantes triviales del
+        mismo enlace cuenten como una sola URL.
+        """
         try:
-            parsed = urlparse(url)
-            # Reconstruir sin fragmento
-            normalized = parsed._replace(fragment='').geturl()
-            return normalized
+            return _normalize(url)
         except Exception:
             return url
 
@@ -207,27 +354,14 @@ class SEOAnalyzer:
         """
         try:
             # ✅ PRIMERO: Verificar extensiones/protocolos (aplicar ANTES de cualquier otra cosa)
-            invalid_protocols = ['mailto:', 'tel:', 'javascript:', 'data:']
-            if any(url.lower().startswith(proto) for proto in invalid_protocols):
+            url_l = url.lower()
+            if url_l.startswith(_INVALID_PROTOS):
                 logger.debug(f"is_valid_url: protocolo inválido: {url}")
                 return False
             
-            excluded_extensions = [
-                # Imágenes y documentos
-                '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.ico', '.svg', '.webp',
-                # Recursos web
-                '.css', '.js', '.json', '.xml', '.txt',
-                # Fuentes
-                '.woff', '.woff2', '.ttf', '.eot', '.otf',
-                # Media
-                '.mp3', '.mp4', '.wav', '.ogg', '.webm',
-                # Recursos estáticos
-                '.map'
-            ]
-            
-            if any(url.lower().endswith(ext) for ext in excluded_extensions):
+            if url_l.endswith(_EXCLUDED_EXTS):
                 # Si es una imagen, agregarla a la lista de imágenes pero no analizarla
-                if any(url.lower().endswith(img_ext) for img_ext in ['.jpg', '.jpeg', '.png', '.gif', '.ico', '.svg', '.webp']):
+                if url_l.endswith(_IMAGE_EXTS):
                     if self.analyze_images:
                         img_data = {
                             'Pagina Origen': url,
@@ -238,25 +372,17 @@ class SEOAnalyzer:
                             'Peso': '0 KB',
                             'Estado': 'No verificado'
                         }
-                        self.images.append(img_data)
+                        self._add_image(img_data)
                 logger.debug(f"is_valid_url: extensión excluida: {url}")
                 return False
             
             # Verificar patrones de recursos estáticos
-            static_patterns = [
-                '/_next/static/',
-                '/static/',
-                '/assets/',
-                '/dist/',
-                '/build/',
-                '/themes/'
-            ]
-            if any(pattern in url.lower() for pattern in static_patterns):
+            if any(pattern in url_l for pattern in _STATIC_PATTERNS):
                 logger.debug(f"is_valid_url: patrón estático detectado: {url}")
                 return False
             
             # ✅ SEGUNDO: Parsear y verificar dominio (aplicar DESPUÉS de descartar extensiones/protocolos)
-            parsed = urlparse(url)
+            parsed = _cached_urlparse(url)
             
             # Si la URL no tiene netloc (p.ej. es relativa), permitir
             # (será normalizada en add_url_to_queue)
@@ -271,7 +397,7 @@ class SEOAnalyzer:
                     return False
             else:
                 # Modo 2: Crawling general (SOLO mismo dominio)
-                if not self.is_same_domain(url, self.base_url):
+                if _domain_key(url) != self._base_domain:
                     logger.debug(f"is_valid_url: dominio distinto al base_url: {url}")
                     return False
             
@@ -290,18 +416,18 @@ class SEOAnalyzer:
         """
         try:
             # Normalizar rutas relativas respecto a la base_url si es necesario
-            parsed = urlparse(url)
+            parsed = _cached_urlparse(url)
             if not parsed.netloc and self.base_url:
                 url = urljoin(self.base_url, url)
 
             url = self._normalize_url(url)
             
             # Rechazar si ya fue visitada o ya está en cola
-            if url in self.visited or url in self.to_visit:
+            if url in self.visited or url in self._queued:
                 return False
 
             # Verificar circuito por dominio (evitar hammering a dominios con fallos repetidos)
-            domain = urlparse(url).netloc.replace('www.', '')
+            domain = _cached_urlparse(url).netloc.replace('www.', '')
             if self._is_circuit_open(domain):
                 logger.debug(f"Circuit open for domain {domain}, saltando {url}")
                 return False
@@ -317,6 +443,7 @@ class SEOAnalyzer:
                     elif isinstance(cached, int) and cached < 400:
                         # URL está en caché como exitosa, agregar a la cola
                         self.to_visit.append(url)
+                        self._queued.add(url)
                         logger.debug(f"add_url_to_queue: URL en caché como exitosa: {url}")
                         return True
                 except Exception:
@@ -330,6 +457,7 @@ class SEOAnalyzer:
             # ✅ SIMPLIFICACIÓN: Agregar directamente a la cola sin HEAD/GET
             # La validación de contenido ocurre en crawl_page()
             self.to_visit.append(url)
+            self._queued.add(url)
             logger.debug(f"add_url_to_queue: URL añadida a la cola: {url}")
             return True
 
@@ -339,6 +467,29 @@ class SEOAnalyzer:
 
         return False
 
+    def _link_status(self, url):
+        """_check_link_status con caché por URL durante todo el análisis.
+
+        En los aciertos de caché se vuelve a anotar la redirección o el error,
+        igual que si se hubiera verificado, para que los totales no cambien.
+        """
+        result = self._link_status_cache.get(url)
+        if result is None:
+            result = self._check_link_status(url)
+            # Un circuito abierto no dice nada del enlace: no se guarda
+            if result.get('code') != 'CIRCUIT_OPEN':
+                self._link_status_cache[url] = result
+            return dict(result)
+        code = result.get('code')
+        try:
+            if isinstance(code, int) and 300 <= code < 400:
+                self.redirected_urls.append({'url': url, 'code': code})
+            elif code != 200:
+                self.broken_links.append({'url': url, 'code': code})
+        except Exception:
+            pass
+        return dict(result)
+
     def _check_link_status(self, url):
         """Verifica el estado de un enlace y retorna su información."""
         # Reusar resultado si ya lo tenemos en cache para evitar peticiones duplicadas
@@ -377,7 +528,7 @@ class SEOAnalyzer:
             pass
         try:
             # Circuit breaker check per domain
-            domain = urlparse(url).netloc.replace('www.', '')
+            domain = _cached_urlparse(url).netloc.replace('www.', '')
             if self._is_circuit_open(domain):
                 return {'status': 'Circuit Open', 'code': 'CIRCUIT_OPEN'}
 
@@ -499,6 +650,59 @@ class SEOAnalyzer:
         # after retries, raise the last exception
         raise last_exc
             
+    def _add_image(self, img_data):
+        """Registra una imagen si no existe ya para la misma página de origen."""
+        key = (img_data.get('Pagina Origen'), img_data.get('URL Imagen'))
+        if key in self._image_keys:
+            return
+        self._image_keys.add(key)
+        self.images.append(img_data)
+
+    def _probe_image(self, img_url):
+        """Verifica una imagen con HEAD y devuelve (estado, tipo, peso), cacheado por URL."""
+        cached = self._image_probe_cache.get(img_url)
+        if cached is not None:
+            return cached
+
+        estado, tipo, peso = 'No funcional', 'Desconocido', '0 KB'
+        try:
+            # Intentar HEAD request primero (más rápido)
+            response = self.session.head(img_url, timeout=5, allow_redirects=True)
+            content_type = response.headers.get('content-type', '').lower()
+            
+            if response.status_code == 200:
+                estado = 'Funcional'
+                
+                # Determinar tipo de imagen
+                if 'image/' in content_type:
+                    tipo = content_type.split('/')[-1].split(';')[0].upper()
+                else:
+                    # Intentar por extensión de archivo
+                    ext = os.path.splitext(img_url.lower())[1].lstrip('.')
+                    if ext in ['jpg', 'jpeg', 'png', 'gif', 'webp', 'svg', 'avif']:
+                        tipo = ext.upper()
+                
+                # Obtener peso
+                content_length = response.headers.get('content-length')
+                if content_length:
+                    size_bytes = int(content_length)
+                    if size_bytes < 1024:
+                        peso = f"{size_bytes} B"
+                    elif size_bytes < 1024*1024:
+                        peso = f"{size_bytes/1024:.1f} KB"
+                    else:
+                        peso = f"{size_bytes/(1024*1024):.1f} MB"
+            
+        except Exception:
+            # Si falla el HEAD, intentar determinar tipo por URL
+            ext = os.path.splitext(img_url.lower())[1].lstrip('.')
+            if ext in ['jpg', 'jpeg', 'png', 'gif', 'webp', 'svg', 'avif']:
+                tipo = ext.upper()
+
+        result = (estado, tipo, peso)
+        self._image_probe_cache[img_url] = result
+        return result
+
     def _analyze_image(self, img, page_url):
         """Analiza una imagen y retorna sus características."""
         try:
@@ -508,58 +712,53 @@ class SEOAnalyzer:
                 return None
             
             # Convertir a URL absoluta
-            img_url = urljoin(page_url, img_src)
+            img_url = _cached_urljoin(page_url, img_src)
             
-            image_data = {
+            # Estado, tipo y peso (una sola petición HEAD por URL en todo el análisis)
+            estado, tipo, peso = self._probe_image(img_url)
+            
+            return {
                 'Pagina Origen': page_url,
                 'URL Imagen': img_url,
                 'Title': img.get('title', ''),
                 'Alt': img.get('alt', ''),
-                'Tipo Imagen': 'Desconocido',
-                'Peso': '0 KB',
-                'Estado': 'No funcional'
+                'Tipo Imagen': tipo,
+                'Peso': peso,
+                'Estado': estado
             }
             
-            # Determinar tipo de imagen y verificar estado
-            try:
-                # Intentar HEAD request primero (más rápido)
-                response = self.session.head(img_url, timeout=5, allow_redirects=True)
-                content_type = response.headers.get('content-type', '').lower()
-                
-                if response.status_code == 200:
-                    image_data['Estado'] = 'Funcional'
-                    
-                    # Determinar tipo de imagen
-                    if 'image/' in content_type:
-                        image_data['Tipo Imagen'] = content_type.split('/')[-1].split(';')[0].upper()
-                    else:
-                        # Intentar por extensión de archivo
-                        ext = os.path.splitext(img_url.lower())[1].lstrip('.')
-                        if ext in ['jpg', 'jpeg', 'png', 'gif', 'webp', 'svg', 'avif']:
-                            image_data['Tipo Imagen'] = ext.upper()
-                    
-                    # Obtener peso
-                    content_length = response.headers.get('content-length')
-                    if content_length:
-                        size_bytes = int(content_length)
-                        if size_bytes < 1024:
-                            image_data['Peso'] = f"{size_bytes} B"
-                        elif size_bytes < 1024*1024:
-                            image_data['Peso'] = f"{size_bytes/1024:.1f} KB"
-                        else:
-                            image_data['Peso'] = f"{size_bytes/(1024*1024):.1f} MB"
-                
-            except Exception:
-                # Si falla el HEAD, intentar determinar tipo por URL
-                ext = os.path.splitext(img_url.lower())[1].lstrip('.')
-                if ext in ['jpg', 'jpeg', 'png', 'gif', 'webp', 'svg', 'avif']:
-                    image_data['Tipo Imagen'] = ext.upper()
-            
-            return image_data
-            
         except Exception:
             return None
 
+    def _read_html(self, response):
+        """Lee el cuerpo de una respuesta en streaming, como mucho MAX_HTML_BYTES.
+
+        Las señales SEO están al principio del documento; no se descargan
+        páginas enormes enteras solo para descartar la mayor parte.
+        """
+        buf = bytearray()
+        try:
+            for chunk in response.iter_content(65536):
+                buf.extend(chunk)
+                if len(buf) >= self.MAX_HTML_BYTES:
+                    logger.debug(f"HTML truncado a {self.MAX_HTML_BYTES} bytes: {response.url}")
+                    break
+        finally:
+            response.close()
+        # Charset declarado en la cabecera: se respeta
+        if 'charset=' in response.headers.get('content-type', '').lower() and response.encoding:
+            try:
+                return buf.decode(response.encoding, errors='replace')
+            except LookupError:
+                pass
+        # Sin charset requests supone ISO-8859-1, pero casi todas las páginas son
+        # UTF-8: se prueba en estricto (ignorando un carácter cortado al final
+        # por el límite) y solo si falla se decodifica como latin-1
+        try:
+            return codecs.getincrementaldecoder('utf-8')().decode(buf, final=False)
+        except UnicodeDecodeError:
+            return buf.decode(response.encoding or 'latin-1', errors='replace')
+
     def crawl_page(self, url, progress_callback=None):
         """Analiza una página web independientemente de su tipo."""
         try:
@@ -585,6 +784,7 @@ class SEOAnalyzer:
             content = None
             initial_content = ""
             status_code = None
+            content_type = content_length = None
             use_playwright = False
             source_method = None  # para logging: 'requests' o 'playwright'
 
@@ -598,15 +798,16 @@ class SEOAnalyzer:
                         headers=headers,
                         allow_redirects=True,
                         verify=False,
+                        stream=True,
                     )
 
                     content_type = response.headers.get('content-type', '')
                     content_length = response.headers.get('content-length')
                     status_code = response.status_code
 
-                    # Si el contenido parece ser HTML, leerlo completamente
+                    # Si el contenido parece ser HTML, leerlo (hasta MAX_HTML_BYTES)
                     if content_type and 'html' in content_type.lower():
-                        initial_content = response.text or ""
+                        initial_content = self._read_html(response)
                     else:
                         initial_content = ""
                         response.close()
@@ -619,11 +820,12 @@ class SEOAnalyzer:
                         headers=headers,
                         allow_redirects=True,
                         verify=False,
+                        stream=True,
                     )
 
                     content_type = response.headers.get('content-type', '')
                     content_length = response.headers.get('content-length')
-                    initial_content = response.text or ""
+                    initial_content = self._read_html(response)
                     status_code = response.status_code
 
                 # MEJORADO: Detección inteligente de cuándo usar Playwright
@@ -657,7 +859,7 @@ class SEOAnalyzer:
                     # Check 3: Validar extracción de BeautifulSoup
                     else:
                         try:
-                            soup = BeautifulSoup(initial_content, 'html.parser')
+                            soup = _parse_html(initial_content)
                             if not validate_extraction(soup):
                                 logger.info(f"⚠️  Extracción débil en {url} → Usando Playwright")
                                 use_playwright = True
@@ -679,11 +881,21 @@ class SEOAnalyzer:
 
             # Si es necesario, usar Playwright
             # Circuit breaker: si el dominio tiene el circuito abierto, evitamos Playwright
-            domain = urlparse(url).netloc.replace('www.', '')
+            domain = _cached_urlparse(url).netloc.replace('www.', '')
             if self._is_circuit_open(domain):
                 logger.warning(f"Circuit open for domain {domain}, evitando Playwright para {url}")
                 use_playwright = False
 
+            # No abrir el navegador para PDFs, imágenes o descargas enormes según
+            # las cabeceras de la petición inicial (sin ellas se renderiza)
+            if use_playwright and self.playwright_handler:
+                try:
+                    if not self.playwright_handler.is_renderable(url, content_type, content_length):
+                        logger.info(f"⏭️ Contenido no HTML o demasiado grande en {url} → sin Playwright")
+                        use_playwright = False
+                except Exception as e:
+                    logger.debug(f"Error comprobando si renderizar con Playwright: {e}")
+
             if use_playwright:
                 if progress_callback:
                     progress_callback(f"🎭 Usando Playwright para: {url}")
@@ -749,20 +961,19 @@ class SEOAnalyzer:
                 self.results.append(page_data)
                 return
 
-            # Asegurar content como str y decodificar si es bytes
+            # requests (_read_html) y Playwright ya devuelven str; decodificar
+            # solo si por algún camino llegan bytes
             if isinstance(content, bytes):
-                try:
-                    content = content.decode('utf-8', errors='replace')
-                except Exception:
-                    content = content.decode('latin-1', errors='replace')
+                content = content.decode('utf-8', errors='replace')
 
             # Ahora parsear con BeautifulSoup (sin pasar from_encoding para evitar warning)
-            soup = BeautifulSoup(content, 'html.parser')
+            soup = _parse_html(content)
 
-            # Limpiar scripts, estilos, iframes
-            for script in soup(['script', 'style', 'iframe']):
+            # Limpiar scripts, estilos, iframes y noscript en una sola pasada
+            # (el texto de noscript es contenido alternativo, no de la página)
+            for tag in soup(['script', 'style', 'iframe', 'noscript']):
                 try:
-                    script.decompose()
+                    tag.decompose()
                 except Exception:
                     pass
 
@@ -787,15 +998,13 @@ class SEOAnalyzer:
             # H1s
             h1_tags = soup.find_all('h1')
             if not h1_tags:
-                # fallback selectors
-                candidates = ['title', 'page-title', 'heading', 'hero-title', 'site-title', 'titulo', 'titulo-pagina']
-                for cand in candidates:
-                    try:
-                        found = soup.find(attrs={'class': lambda v, c=cand: v and c in v.lower()})
-                        if found:
-                            h1_tags.append(found)
-                    except Exception:
-                        continue
+                # fallback selectors: un tag por candidato, en una sola pasada
+                try:
+                    found = _scan_attr_candidates(soup, ('class',), _H1_CLASS_CANDIDATES)
+                    h1_tags.extend(found[('class', cand)] for cand in _H1_CLASS_CANDIDATES
+                                   if ('class', cand) in found)
+                except Exception:
+                    pass
                 if not h1_tags:
                     h1_role = soup.find(attrs={'role': 'heading'})
                     if h1_role:
@@ -835,7 +1044,7 @@ class SEOAnalyzer:
                 # ✅ NUEVO: Agregar hreflang a la cola para que sea descubierto
                 self.add_url_to_queue(full_href)
                 
-                link_status = self._check_link_status(full_href)
+                link_status = self._link_status(full_href)
                 code = link_status.get('code', '') if isinstance(link_status, dict) else ''
                 status_text = f"{full_href} ({code if code else 'Error'})"
                 if lang.startswith('es'):
@@ -850,15 +1059,16 @@ class SEOAnalyzer:
                 main = soup_obj.find('main')
                 if main:
                     return main
-                candidates = ['content', 'main', 'page', 'site', 'wrap', 'container', 'app', 'region', 'contenido']
-                for attr in ['id', 'class']:
-                    for cand in candidates:
-                        try:
-                            found = soup_obj.find(attrs={attr: lambda v, c=cand: v and c in v.lower()})
-                            if found:
-                                return found
-                        except Exception:
-                            continue
+                # Misma prioridad que antes (id antes que class, candidatos en
+                # orden) pero con un único recorrido del árbol
+                try:
+                    found = _scan_attr_candidates(soup_obj, ('id', 'class'), _MAIN_CANDIDATES, first_only=True)
+                    for attr in ('id', 'class'):
+                        for cand in _MAIN_CANDIDATES:
+                            if (attr, cand) in found:
+                                return found[(attr, cand)]
+                except Exception:
+                    pass
                 return soup_obj.find('body') or soup_obj
 
             main_container = _find_main_container(soup)
@@ -877,37 +1087,33 @@ class SEOAnalyzer:
                 ])
             page_data['Word Count'] = len(text_content.split())
 
-            # Palabras clave (top 10)
-            import re
-            from collections import Counter
-            stopwords = {'de', 'la', 'que', 'el', 'en', 'y', 'a', 'los', 'del', 'las', 'un', 'por', 'con', 'una',
-                         'su', 'para', 'es', 'al', 'lo', 'como', 'más', 'o', 'pero', 'sus', 'le', 'ha', 'me', 'si',
-                         'sin', 'sobre', 'este', 'ya', 'entre', 'cuando', 'todo', 'esta', 'ser', 'son', 'dos', 'también',
-                         'fue', 'había', 'era', 'muy', 'años', 'hasta', 'desde', 'está', 'mi', 'porque', 'qué', 'sólo',
-                         'han', 'yo', 'hay', 'vez', 'puede', 'todos', 'así', 'nos', 'ni', 'parte', 'tiene', 'él',
-                         'the', 'and', 'to', 'of', 'in', 'for', 'is', 'on', 'that', 'by', 'this', 'with', 'i', 'you',
-                         'it', 'not', 'or', 'be', 'are', 'from', 'at', 'as', 'your', 'all', 'have', 'new', 'more',
-                         'an', 'was', 'we', 'will', 'can', 'us', 'about', 'if', 'my', 'has', 'but', 'our', 'one',
-                         'other', 'do', 'no', 'they', 'he', 'may', 'what', 'which', 'their', 'any', 'there', 'who'}
-            words = re.findall(r'\b\w+\b', text_content.lower())
-            content_words = [word for word in words if word not in stopwords and len(word) > 3]
-            word_freq = Counter(content_words).most_common(10)
+            # Palabras clave (top 10): el filtro alimenta Counter directamente,
+            # sin materializar una segunda lista con las palabras válidas
+            word_freq = Counter(
+                word for word in _WORD_RE.findall(text_content.lower())
+                if len(word) > 3 and word not in _STOPWORDS
+            ).most_common(10)
             page_data['Palabras Clave'] = ', '.join(word for word, _ in word_freq)
 
             # Procesar enlaces si está habilitado (y si no es modo specific_urls)
             anchors = []
             links_found = 0
             if self.analyze_links and not self.specific_urls:
-                source_domain = urlparse(url).netloc.replace('www.', '')
+                source_domain = _cached_urlparse(url).netloc.replace('www.', '')
                 # Recolectar enlaces y procesar sus estados en paralelo para mejorar rendimiento
                 link_entries = []
-                for element in soup.find_all(['a', 'area', 'link']):
-                    href = element.get('href', '').strip()
-                    if not href or href.startswith(('javascript:', 'data:', 'tel:', 'mailto:')):
+                # Los enlaces relativos se resuelven contra <base href> si la
+                # página lo declara, igual que en el navegador
+                base_tag = soup.find('base', href=True)
+                link_base = urljoin(url, base_tag['href'].strip()) if base_tag else url
+                # href=True descarta en el propio find_all los elementos sin href
+                for element in soup.find_all(['a', 'area', 'link'], href=True):
+                    href = element['href'].strip()
+                    if not href or href.startswith(_INVALID_PROTOS):
                         continue
                     try:
-                        full_url = urljoin(url, href)
-                        parsed_url = urlparse(full_url)
+                        full_url = _cached_urljoin(link_base, href)
+                        parsed_url = _cached_urlparse(full_url)
                         if not parsed_url.scheme or not parsed_url.netloc:
                             continue
                         target_domain = parsed_url.netloc.replace('www.', '')
@@ -925,64 +1131,50 @@ class SEOAnalyzer:
                         if progress_callback:
                             progress_callback(f"⚠️ Error procesando enlace en {url}: {str(e)}")
 
-                # Verificar el estado de los enlaces en paralelo (con límite razonable de workers)
+                # Verificar cada URL distinta una sola vez (una página suele repetir
+                # enlaces a menú, pie, etc.) y en paralelo
                 if link_entries:
+                    unique_urls = list(dict.fromkeys(entry['full_url'] for entry in link_entries))
+                    statuses = {}
                     try:
-                        with concurrent.futures.ThreadPoolExecutor(max_workers=6) as executor:
-                            futures = {executor.submit(self._check_link_status, entry['full_url']): entry for entry in link_entries}
+                        workers = min(self.LINK_CHECK_WORKERS, len(unique_urls))
+                        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                            futures = {executor.submit(self._link_status, link_url): link_url for link_url in unique_urls}
                             for fut in concurrent.futures.as_completed(futures):
-                                entry = futures[fut]
                                 try:
-                                    link_status = fut.result()
+                                    statuses[futures[fut]] = fut.result()
                                 except Exception as e:
-                                    link_status = {'status': f'Error: {e}', 'code': 'ERROR'}
-
-                                link_data = {
-                                    'Source Page': url,
-                                    'Source Domain': source_domain,
-                                    'Target URL': entry['full_url'],
-                                    'Target Domain': entry['target_domain'],
-                                    'Domain Authority': '',
-                                    'Link Type': entry['link_type'],
-                                    'Anchor Text': entry['anchor_text'] if entry['anchor_text'] else '',
-                                    'Status': link_status.get('status', ''),
-                                    'Status Code': link_status.get('code', '')
-                                }
-                                self.links.append(link_data)
-                                links_found += 1
-                                if entry['anchor_text']:
-                                    anchors.append(entry['anchor_text'])
-                                # Si es interno y válido, añadir a la cola usando add_url_to_queue
-                                if entry['link_type'] == 'Interno' and self.is_valid_url(entry['full_url']):
-                                    self.add_url_to_queue(entry['full_url'])
-                                # Si el enlace tiene hreflang y apunta a una URL válida, añadir
-                                if entry.get('hreflang'):
-                                    hreflang_url = entry['full_url']
-                                    if self.is_valid_url(hreflang_url):
-                                        self.add_url_to_queue(hreflang_url)
+                                    statuses[futures[fut]] = {'status': f'Error: {e}', 'code': 'ERROR'}
                     except Exception as e:
-                        # Fallback: procesar secuencialmente si el executor falla
+                        # Fallback: verificar secuencialmente lo que falte si el executor falla
                         if progress_callback:
                             progress_callback(f"⚠️ Error en verificación paralela de enlaces: {e}")
-                        for entry in link_entries:
-                            link_status = self._check_link_status(entry['full_url'])
-                            link_data = {
-                                'Source Page': url,
-                                'Source Domain': source_domain,
-                                'Target URL': entry['full_url'],
-                                'Target Domain': entry['target_domain'],
-                                'Domain Authority': '',
-                                'Link Type': entry['link_type'],
-                                'Anchor Text': entry['anchor_text'] if entry['anchor_text'] else '',
-                                'Status': link_status.get('status', ''),
-                                'Status Code': link_status.get('code', '')
-                            }
-                            self.links.append(link_data)
-                            links_found += 1
-                            if entry['anchor_text']:
-                                anchors.append(entry['anchor_text'])
-                            if entry['link_type'] == 'Interno' and self.is_valid_url(entry['full_url']):
-                                self.add_url_to_queue(entry['full_url'])
+                        for link_url in unique_urls:
+                            if link_url not in statuses:
+                                statuses[link_url] = self._link_status(link_url)
+
+                    # Registrar los enlaces en el orden del documento
+                    for entry in link_entries:
+                        link_status = statuses[entry['full_url']]
+                        link_data = (
+                            url,
+                            source_domain,
+                            entry['full_url'],
+                            entry['target_domain'],
+                            '',
+                            entry['link_type'],
+                            entry['anchor_text'] if entry['anchor_text'] else '',
+                            link_status.get('status', ''),
+                            link_status.get('code', '')
+                        )
+                        self.links.append(link_data)
+                        links_found += 1
+                        if entry['anchor_text']:
+                            anchors.append(entry['anchor_text'])
+                        # Si es interno (o un hreflang) y válido, añadir a la cola
+                        if ((entry['link_type'] == 'Interno' or entry.get('hreflang'))
+                                and self.is_valid_url(entry['full_url'])):
+                            self.add_url_to_queue(entry['full_url'])
 
             if anchors:
                 page_data['Anchor'] = ' | '.join(set(anchors))
@@ -1001,7 +1193,7 @@ class SEOAnalyzer:
                         'Peso': '0 KB',
                         'Estado': 'Pendiente verificar'
                     }
-                    self.images.append(favicon_data)
+                    self._add_image(favicon_data)
                 img_tags = soup.find_all('img')
                 for source in soup.find_all(['source', 'picture']):
                     if source.get('srcset'):
@@ -1010,24 +1202,34 @@ class SEOAnalyzer:
                             img = soup.new_tag('img')
                             img['src'] = src
                             img_tags.append(img)
-                # Analizar imágenes en paralelo para mejorar rendimiento
+                # Una sola entrada por URL de imagen y página (_add_image descartaría
+                # las repetidas): así tampoco se verifica dos veces la misma imagen
+                unique_imgs = []
+                seen_srcs = set()
+                for img in img_tags:
+                    src = img.get('src') or img.get('data-src') or img.get('data-lazy-src')
+                    if not src:
+                        continue
+                    img_url = _cached_urljoin(url, src)
+                    if img_url in seen_srcs or (url, img_url) in self._image_keys:
+                        continue
+                    seen_srcs.add(img_url)
+                    unique_imgs.append(img)
+                img_tags = unique_imgs
+                # Analizar imágenes en paralelo; se registran en el orden del documento
                 if img_tags:
                     try:
-                        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as img_executor:
-                            img_futures = [img_executor.submit(self._analyze_image, img, url) for img in img_tags]
-                            for fut in concurrent.futures.as_completed(img_futures):
-                                try:
-                                    img_data = fut.result()
-                                except Exception:
-                                    img_data = None
+                        workers = min(self.IMAGE_CHECK_WORKERS, len(img_tags))
+                        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as img_executor:
+                            for img_data in img_executor.map(lambda img: self._analyze_image(img, url), img_tags):
                                 if img_data:
-                                    self.images.append(img_data)
+                                    self._add_image(img_data)
                     except Exception:
                         # Fallback secuencial si hay problema con el executor
                         for img in img_tags:
                             img_data = self._analyze_image(img, url)
                             if img_data:
-                                self.images.append(img_data)
+                                self._add_image(img_data)
 
             # Añadir page_data a resultados
             self.results.append(page_data)
@@ -1073,7 +1275,7 @@ class SEOAnalyzer:
                 }
                 if 'content' in locals() and content:
                     try:
-                        soup = BeautifulSoup(content, 'html.parser')
+                        soup = _parse_html(content)
                         title_tag = soup.find('title')
                         if title_tag:
                             page_data['Meta Titulo'] = title_tag.get_text().strip()
@@ -1125,8 +1327,12 @@ class SEOAnalyzer:
             # Restaurar estado
             self.visited = self.current_state['visited']
             self.to_visit = deque(self.current_state['to_visit'])
+            # Reconstruir el registro de la cola: lo encolado tras la pausa ya no está
+            self._queued = set(self.to_visit)
             self.results = self.current_state['results']
             self.images = self.current_state['images']
+            # Reconstruir el registro de imágenes: lo añadido tras la pausa ya no está
+            self._image_keys = {(i.get('Pagina Origen'), i.get('URL Imagen')) for i in self.images}
             self.links = self.current_state['links']
             self.specific_urls = self.current_state['specific_urls']
             self.analyze_images = self.current_state['analyze_images']
@@ -1260,8 +1466,21 @@ class SEOAnalyzer:
         except Exception:
             pass
             
-    def generate_report(self, progress_callback=None):
-        """Genera un reporte Excel con los resultados del análisis."""
+    def default_report_filename(self):
+        """Nombre sugerido para el reporte según el modo (completo o URLs específicas)."""
+        # Formato ejemplo: 'Analisis Seo Completo 30,10,2025,1430.xlsx' o
+        # 'Analisis URLs Especificas 30,10,2025,1430.xlsx'
+        ts = datetime.now().strftime("%d,%m,%Y,%H%M")
+        if self.specific_urls:
+            return f"Analisis URLs Especificas {ts}.xlsx"
+        return f"Analisis Seo Completo {ts}.xlsx"
+
+    def generate_report(self, progress_callback=None, filename=None):
+        """Genera un reporte Excel con los resultados del análisis.
+
+        Si no se indica filename se pregunta al usuario con un diálogo, por lo
+        que en ese caso debe llamarse desde el hilo de Tk.
+        """
         if not self.results:
             if progress_callback:
                 progress_callback("❌ No hay datos para generar el reporte")
@@ -1271,21 +1490,13 @@ class SEOAnalyzer:
             progress_callback("📊 Generando reporte en Excel...")
             
         try:
-            # Generar nombre del archivo basado en el modo (completo o URLs específicas)
-            # Formato ejemplo: 'Analisis Seo Completo 30,10,2025,1430.xlsx' o
-            # 'Analisis URLs Especificas 30,10,2025,1430.xlsx'
-            ts = datetime.now().strftime("%d,%m,%Y,%H%M")
-            if self.specific_urls:
-                default_filename = f"Analisis URLs Especificas {ts}.xlsx"
-            else:
-                default_filename = f"Analisis Seo Completo {ts}.xlsx"
-            
             # Permitir al usuario elegir dónde guardar
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".xlsx",
-                filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")],
-                initialfile=default_filename
-            )
+            if filename is None:
+                filename = filedialog.asksaveasfilename(
+                    defaultextension=".xlsx",
+                    filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")],
+                    initialfile=self.default_report_filename()
+                )
             
             if not filename:
                 return None
@@ -1494,7 +1705,7 @@ class SEOAnalyzer:
                 
                 # Generar hoja de Enlaces Detallados
                 if self.links:
-                    links_df = pd.DataFrame(self.links)
+                    links_df = pd.DataFrame.from_records(self.links, columns=LINK_COLUMNS)
                     # Definir y ordenar columnas
                     link_columns = [
                         'Source Page',